@@ -10,13 +10,15 @@ This is the primary GUI interface for Grey Hat AI, providing:
 """
 
 import streamlit as st
+import collections
 import threading
 import queue
-import time
 import json
 import logging
 import traceback
-from typing import Dict, Any, List, Optional
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterator, List, Optional
 import os
 import sys
 
@@ -26,8 +28,9 @@ sys.path.insert(0, project_root)
 
 # Import Grey Hat AI modules
 from grey_hat_ai.llm_manager import LLMManager, LLMResponse
-from grey_hat_ai.voice_engine import VoiceEngine, VoiceConfig
+from grey_hat_ai.voice_engine import VoiceEngine, VoiceConfig, iter_sentences
 from grey_hat_ai.autonomous_web_agent import create_web_agent_tool
+from grey_hat_ai.semantic_cache import SemanticCache, identifier_key
 
 # Import CAI framework components
 try:
@@ -53,7 +56,7 @@ st.set_page_config(
 )
 
 # Custom CSS for better styling
-st.markdown("""
+CUSTOM_CSS = """
 <style>
     .main-header {
         font-size: 2.5rem;
@@ -82,16 +85,6 @@ st.markdown("""
         color: #721c24;
         border: 1px solid #f5c6cb;
     }
-    .agent-scratchpad {
-        background-color: #f8f9fa;
-        border: 1px solid #dee2e6;
-        border-radius: 0.5rem;
-        padding: 1rem;
-        font-family: 'Courier New', monospace;
-        font-size: 0.9rem;
-        max-height: 400px;
-        overflow-y: auto;
-    }
     .voice-indicator {
         display: inline-block;
         width: 12px;
@@ -112,80 +105,201 @@ st.markdown("""
         100% { opacity: 1; }
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+# Static page header, sent together with the CSS in a single markdown call.
+# Streamlit drops elements that are not re-emitted on a rerun, so this has to
+# be sent every run; keeping it one prebuilt string makes that one message.
+STATIC_HEADER_HTML = CUSTOM_CSS + (
+    '<div class="main-header">🎯 Grey Hat AI</div>\n'
+    '<em>Advanced Cybersecurity AI Framework with GUI and Voice Integration</em>'
+)
+
+# Number of most recent messages rendered in the conversation panel
+CONVERSATION_RENDER_LIMIT = 50
+CONVERSATION_CONTAINER_HEIGHT = 500  # pixels
+
+# Maximum number of messages sent to the LLM as conversation context
+LLM_HISTORY_MAX_MESSAGES = 20
+
+# Maximum number of lines kept in the agent scratchpad
+SCRATCHPAD_MAX_LINES = 500
+
+# Maximum number of pending voice events before the oldest is dropped
+VOICE_QUEUE_MAX_EVENTS = 64
+
+# Number of prior messages folded into the response cache key
+RESPONSE_CACHE_HISTORY_TAIL = 4
+
+# Sidebar API key inputs: provider -> (input label, display name, help text)
+API_KEY_FIELDS = {
+    "gemini": ("Google Gemini API Key", "Gemini", "Enter your Google Gemini API key"),
+    "mistral": ("Mistral AI API Key", "Mistral", "Enter your Mistral AI API key"),
+    "groq": ("Groq API Key", "Groq", "Enter your Groq API key"),
+    "elevenlabs": ("Eleven Labs API Key", "Eleven Labs", "Enter your Eleven Labs API key for TTS"),
+}
+
+
+@st.cache_resource
+def get_llm_manager() -> LLMManager:
+    """Get the process-wide LLM manager, built once and reused across reruns."""
+    return LLMManager()
+
+
+@st.cache_resource
+def get_voice_engine() -> VoiceEngine:
+    """Get the process-wide voice engine, built once and reused across reruns."""
+    return VoiceEngine(VoiceConfig())
+
+
+@st.cache_resource
+def get_web_tools() -> Dict[str, Any]:
+    """Get the web agent tool functions, built once and reused across reruns."""
+    return create_web_agent_tool()
+
+
+@st.cache_data(ttl=3600)
+def _cached_models(provider: str) -> Dict[str, List[str]]:
+    """Get the model list for a provider, cached across reruns."""
+    return get_llm_manager().get_available_models(provider)
+
+
+@st.cache_data(ttl=300)
+def _cached_voices(_engine: VoiceEngine, engine_id: int, api_key: str) -> Dict[str, str]:
+    """Get the Eleven Labs voice list, cached per engine and key so polling reruns skip the API."""
+    return _engine.get_available_voices()
+
+
+@st.cache_resource
+def get_response_cache() -> SemanticCache:
+    """Get the process-wide semantic cache for LLM responses."""
+    return SemanticCache(threshold=0.95)
+
+
+@st.cache_resource
+def get_llm_pool() -> ThreadPoolExecutor:
+    """Get the persistent worker pool used for blocking LLM provider calls."""
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix="llm")
+
+
+@st.cache_resource
+def get_tts_pool() -> ThreadPoolExecutor:
+    """Get the persistent worker pool used for TTS synthesis and playback."""
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix="tts")
 
 
 class GreyHatAI:
     """Main application class for Grey Hat AI."""
     
     def __init__(self):
-        self.llm_manager = LLMManager()
+        self.llm_manager = get_llm_manager()
         self.voice_engine = None
-        self.voice_queue = queue.Queue()
         self.agent = None
         self.web_tools = None
+        self._llm_pool = get_llm_pool()
+        self._response_cache = get_response_cache()
+        self._tts_pool = get_tts_pool()
         
         # Initialize session state
         self._initialize_session_state()
         
-        # Initialize components
-        self._initialize_voice_engine()
+        # Keep the voice queue in session state so queued speech survives reruns
+        self.voice_queue = st.session_state.setdefault(
+            "voice_queue", queue.Queue(maxsize=VOICE_QUEUE_MAX_EVENTS)
+        )
+        
+        # Initialize components; the voice engine (Whisper) is only loaded on
+        # first use, then reattached from the resource cache on later reruns
+        if st.session_state.voice_engine_available:
+            self._get_voice_engine()
         self._initialize_web_tools()
     
     def _initialize_session_state(self):
         """Initialize Streamlit session state variables."""
-        if "conversation_history" not in st.session_state:
-            st.session_state.conversation_history = []
-        
-        if "agent_scratchpad" not in st.session_state:
-            st.session_state.agent_scratchpad = []
-        
-        if "voice_listening" not in st.session_state:
-            st.session_state.voice_listening = False
-        
-        if "api_keys_configured" not in st.session_state:
-            st.session_state.api_keys_configured = {
-                "gemini": False,
-                "mistral": False,
-                "groq": False,
-                "elevenlabs": False
-            }
-        
-        if "active_llm" not in st.session_state:
-            st.session_state.active_llm = None
-        
-        if "target" not in st.session_state:
-            st.session_state.target = ""
-        
-        if "auto_test_running" not in st.session_state:
-            st.session_state.auto_test_running = False
+        state = st.session_state
+        state.setdefault("conversation_history", [])
+        state.setdefault("llm_history", collections.deque(maxlen=LLM_HISTORY_MAX_MESSAGES))
+        state.setdefault("agent_scratchpad", collections.deque(maxlen=SCRATCHPAD_MAX_LINES))
+        state.setdefault("scratchpad_text", "")
+        state.setdefault("voice_listening", False)
+        state.setdefault("voice_engine_available", None)  # Unknown until first load
+        state.setdefault("api_keys_configured", {
+            "gemini": False,
+            "mistral": False,
+            "groq": False,
+            "elevenlabs": False
+        })
+        state.setdefault("api_key_feedback", {})
+        state.setdefault("configured_providers", set())
+        state.setdefault("active_llm", None)
+        state.setdefault("target", "")
+        state.setdefault("auto_test_running", False)
+        # Keys this browser session's conversation state in the shared LLMManager
+        state.setdefault("session_id", uuid.uuid4().hex)
     
-    def _initialize_voice_engine(self):
-        """Initialize the voice engine."""
-        try:
-            config = VoiceConfig()
-            self.voice_engine = VoiceEngine(config)
-            
-            # Set up voice callbacks
-            self.voice_engine.on_speech_detected = self._on_speech_detected
-            self.voice_engine.on_listening_start = lambda: setattr(st.session_state, "voice_listening", True)
-            self.voice_engine.on_listening_stop = lambda: setattr(st.session_state, "voice_listening", False)
-            
-        except Exception as e:
-            logger.error(f"Failed to initialize voice engine: {e}")
-            self.voice_engine = None
+    def _get_voice_engine(self) -> Optional[VoiceEngine]:
+        """Load the voice engine on first use and wire up its callbacks."""
+        if self.voice_engine is None:
+            try:
+                self.voice_engine = get_voice_engine()
+                
+                # Set up voice callbacks
+                self.voice_engine.on_speech_detected = self._on_speech_detected
+                self.voice_engine.on_listening_start = lambda: setattr(st.session_state, "voice_listening", True)
+                self.voice_engine.on_listening_stop = lambda: setattr(st.session_state, "voice_listening", False)
+                st.session_state.voice_engine_available = True
+                
+            except Exception as e:
+                logger.error(f"Failed to initialize voice engine: {e}")
+                self.voice_engine = None
+                st.session_state.voice_engine_available = False
+        
+        return self.voice_engine
     
     def _initialize_web_tools(self):
         """Initialize web automation tools."""
         try:
-            self.web_tools = create_web_agent_tool()
+            self.web_tools = get_web_tools()
         except Exception as e:
             logger.error(f"Failed to initialize web tools: {e}")
             self.web_tools = None
     
     def _on_speech_detected(self, text: str):
         """Callback for when speech is detected."""
-        self.voice_queue.put({"type": "speech", "text": text})
+        event = {"type": "speech", "text": text}
+        try:
+            self.voice_queue.put_nowait(event)
+        except queue.Full:
+            # Drop the oldest event rather than block the recording thread
+            try:
+                self.voice_queue.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                self.voice_queue.put_nowait(event)
+            except queue.Full:
+                logger.warning("Voice queue full, dropping speech event")
+    
+    def _on_api_key_change(self, provider: str):
+        """Validate a newly committed API key for a provider."""
+        api_key = st.session_state.get(f"{provider}_key_input", "")
+        if not api_key or api_key == st.session_state.get(f"{provider}_key", ""):
+            return
+        
+        if provider == "elevenlabs":
+            voice_engine = self._get_voice_engine()
+            success = bool(voice_engine and voice_engine.set_elevenlabs_api_key(api_key))
+        else:
+            success = self.llm_manager.set_api_key(provider, api_key)
+        
+        if success:
+            st.session_state.api_keys_configured[provider] = True
+            st.session_state[f"{provider}_key"] = api_key
+            if provider != "elevenlabs":
+                st.session_state.configured_providers.add(provider)
+        else:
+            st.session_state.configured_providers.discard(provider)
+        st.session_state.api_key_feedback[provider] = success
     
     def render_sidebar(self):
         """Render the sidebar with configuration options."""
@@ -194,70 +308,31 @@ class GreyHatAI:
         # API Keys Section
         st.sidebar.markdown("### 🔑 API Keys")
         
-        # Google Gemini
-        gemini_key = st.sidebar.text_input(
-            "Google Gemini API Key",
-            type="password",
-            help="Enter your Google Gemini API key"
-        )
-        if gemini_key and gemini_key != st.session_state.get("gemini_key", ""):
-            if self.llm_manager.set_api_key("gemini", gemini_key):
-                st.session_state.api_keys_configured["gemini"] = True
-                st.session_state.gemini_key = gemini_key
-                st.sidebar.success("✅ Gemini configured")
-            else:
-                st.sidebar.error("❌ Gemini configuration failed")
-        
-        # Mistral AI
-        mistral_key = st.sidebar.text_input(
-            "Mistral AI API Key",
-            type="password",
-            help="Enter your Mistral AI API key"
-        )
-        if mistral_key and mistral_key != st.session_state.get("mistral_key", ""):
-            if self.llm_manager.set_api_key("mistral", mistral_key):
-                st.session_state.api_keys_configured["mistral"] = True
-                st.session_state.mistral_key = mistral_key
-                st.sidebar.success("✅ Mistral configured")
-            else:
-                st.sidebar.error("❌ Mistral configuration failed")
-        
-        # Groq
-        groq_key = st.sidebar.text_input(
-            "Groq API Key",
-            type="password",
-            help="Enter your Groq API key"
-        )
-        if groq_key and groq_key != st.session_state.get("groq_key", ""):
-            if self.llm_manager.set_api_key("groq", groq_key):
-                st.session_state.api_keys_configured["groq"] = True
-                st.session_state.groq_key = groq_key
-                st.sidebar.success("✅ Groq configured")
-            else:
-                st.sidebar.error("❌ Groq configuration failed")
-        
-        # Eleven Labs
-        elevenlabs_key = st.sidebar.text_input(
-            "Eleven Labs API Key",
-            type="password",
-            help="Enter your Eleven Labs API key for TTS"
-        )
-        if elevenlabs_key and elevenlabs_key != st.session_state.get("elevenlabs_key", ""):
-            if self.voice_engine and self.voice_engine.set_elevenlabs_api_key(elevenlabs_key):
-                st.session_state.api_keys_configured["elevenlabs"] = True
-                st.session_state.elevenlabs_key = elevenlabs_key
-                st.sidebar.success("✅ Eleven Labs configured")
-            else:
-                st.sidebar.error("❌ Eleven Labs configuration failed")
+        # Keys are validated in an on_change callback, once per committed value,
+        # rather than on every rerun while the field holds a new value
+        for provider, (label, name, help_text) in API_KEY_FIELDS.items():
+            st.sidebar.text_input(
+                label,
+                type="password",
+                key=f"{provider}_key_input",
+                on_change=self._on_api_key_change,
+                args=(provider,),
+                help=help_text
+            )
+            feedback = st.session_state.api_key_feedback.pop(provider, None)
+            if feedback is True:
+                st.sidebar.success(f"✅ {name} configured")
+            elif feedback is False:
+                st.sidebar.error(f"❌ {name} configuration failed")
         
         st.sidebar.markdown("---")
         
         # LLM Selection
         st.sidebar.markdown("### 🤖 LLM Selection")
         
-        # Get available providers
-        configured_providers = [p for p, configured in st.session_state.api_keys_configured.items() 
-                              if configured and p != "elevenlabs"]
+        # Get available providers, in the manager's canonical order
+        configured_providers = [p for p in LLMManager.SUPPORTED_PROVIDERS
+                                if p in st.session_state.configured_providers]
         
         if configured_providers:
             selected_provider = st.sidebar.selectbox(
@@ -267,7 +342,7 @@ class GreyHatAI:
             )
             
             # Get available models for selected provider
-            available_models = self.llm_manager.get_available_models(selected_provider)
+            available_models = _cached_models(selected_provider)
             if selected_provider in available_models:
                 selected_model = st.sidebar.selectbox(
                     "Model",
@@ -290,7 +365,7 @@ class GreyHatAI:
         # Voice Configuration
         st.sidebar.markdown("### 🎤 Voice Settings")
         
-        if self.voice_engine:
+        if st.session_state.voice_engine_available is not False:
             # Voice status indicator
             voice_status = "🟢 Listening" if st.session_state.voice_listening else "🔴 Idle"
             st.sidebar.markdown(f"**Status:** {voice_status}")
@@ -301,18 +376,21 @@ class GreyHatAI:
             with col1:
                 if st.button("🎤 Start Voice"):
                     if not st.session_state.voice_listening:
-                        self.voice_engine.start_listening()
+                        if self._get_voice_engine():
+                            self.voice_engine.start_listening()
                         st.rerun()
             
             with col2:
                 if st.button("🔇 Stop Voice"):
-                    if st.session_state.voice_listening:
+                    if st.session_state.voice_listening and self.voice_engine:
                         self.voice_engine.stop_listening()
                         st.rerun()
             
             # Voice model selection (if Eleven Labs configured)
-            if st.session_state.api_keys_configured.get("elevenlabs", False):
-                voices = self.voice_engine.get_available_voices()
+            if self.voice_engine and st.session_state.api_keys_configured.get("elevenlabs", False):
+                voices = _cached_voices(
+                    self.voice_engine, id(self.voice_engine), st.session_state.get("elevenlabs_key", "")
+                )
                 if voices:
                     selected_voice = st.sidebar.selectbox(
                         "TTS Voice",
@@ -365,9 +443,8 @@ class GreyHatAI:
     
     def render_main_interface(self):
         """Render the main interface."""
-        # Header
-        st.markdown('<div class="main-header">🎯 Grey Hat AI</div>', unsafe_allow_html=True)
-        st.markdown("*Advanced Cybersecurity AI Framework with GUI and Voice Integration*")
+        # Styles and header
+        st.markdown(STATIC_HEADER_HTML, unsafe_allow_html=True)
         
         # Main layout
         col1, col2 = st.columns([1, 1])
@@ -382,19 +459,20 @@ class GreyHatAI:
         """Render the conversation panel."""
         st.markdown("### 💬 Conversation")
         
-        # Display conversation history
-        conversation_container = st.container()
+        # Display the most recent messages in a fixed-height scroll container
+        conversation_container = st.container(height=CONVERSATION_CONTAINER_HEIGHT)
         
         with conversation_container:
-            for message in st.session_state.conversation_history:
+            for message in st.session_state.conversation_history[-CONVERSATION_RENDER_LIMIT:]:
                 with st.chat_message(message["role"]):
                     st.write(message["content"])
         
         # User input
         user_input = st.chat_input("Enter your message or use voice input...")
         
-        # Process voice input
-        self._process_voice_input()
+        # Poll voice input without rerunning the whole app
+        if st.session_state.voice_listening:
+            self._voice_poll_fragment()
         
         # Process user input
         if user_input:
@@ -410,86 +488,198 @@ class GreyHatAI:
         
         with scratchpad_container:
             if st.session_state.agent_scratchpad:
-                scratchpad_text = "\\n".join(st.session_state.agent_scratchpad)
-                st.markdown(f'<div class="agent-scratchpad">{scratchpad_text}</div>', 
-                          unsafe_allow_html=True)
+                st.code(st.session_state.scratchpad_text, language=None)
             else:
                 st.info("Agent scratchpad will appear here during operation...")
     
+    @st.fragment(run_every="100ms")
+    def _voice_poll_fragment(self):
+        """Drain pending voice input on a timer scoped to this fragment only."""
+        self._process_voice_input()
+    
+    def _scratchpad_add(self, *lines: str):
+        """Append lines to the scratchpad and keep the joined text in sync."""
+        scratchpad = st.session_state.agent_scratchpad
+        text = st.session_state.scratchpad_text
+        
+        for line in lines:
+            # Drop the oldest line (and its separator) from the cached text when the deque wraps
+            if len(scratchpad) == scratchpad.maxlen:
+                text = text[len(scratchpad[0]) + 1:]
+            
+            scratchpad.append(line)
+            text = f"{text}\n{line}" if text else line
+        
+        st.session_state.scratchpad_text = text
+    
     def _process_voice_input(self):
         """Process voice input from the queue."""
+        # Drain everything pending first; _process_user_input reruns the script,
+        # so anything left in the queue would otherwise wait for the next poll
+        items = []
         try:
-            while not self.voice_queue.empty():
-                voice_data = self.voice_queue.get_nowait()
-                if voice_data["type"] == "speech":
-                    text = voice_data["text"]
-                    st.info(f"🎤 Voice input: {text}")
-                    self._process_user_input(text)
+            while True:
+                items.append(self.voice_queue.get_nowait())
         except queue.Empty:
             pass
+        
+        # Handle each utterance as its own turn; only the last one reruns the app
+        texts = [item["text"] for item in items if item["type"] == "speech"]
+        for i, text in enumerate(texts):
+            st.info(f"🎤 Voice input: {text}")
+            self._process_user_input(text, defer_rerun=i < len(texts) - 1)
     
-    def _process_user_input(self, user_input: str):
-        """Process user input and generate agent response."""
-        # Add user message to conversation
-        st.session_state.conversation_history.append({
-            "role": "user",
-            "content": user_input
-        })
+    def _process_user_input(self, user_input: str, defer_rerun: bool = False):
+        """
+        Process user input and generate agent response.
         
-        # Add to scratchpad
-        st.session_state.agent_scratchpad.append(f"USER: {user_input}")
+        Args:
+            user_input: The user's message
+            defer_rerun: Skip the closing st.rerun() so a caller handling a
+                batch of inputs can rerun once after the last one
+        """
+        # Add user message to conversation and to the rolling LLM context
+        message = {"role": "user", "content": user_input}
+        st.session_state.conversation_history.append(message)
+        st.session_state.llm_history.append(message)
+        
+        # Scratchpad lines for this turn, added in one batch before the rerun
+        lines = [f"USER: {user_input}"]
         
         # Generate response
         if st.session_state.active_llm:
             try:
-                # Prepare conversation history for LLM
-                history = [
-                    {"role": msg["role"], "content": msg["content"]}
-                    for msg in st.session_state.conversation_history[:-1]  # Exclude current message
-                ]
+                # Prepare conversation history for LLM (bounded window, excluding current message)
+                history = list(st.session_state.llm_history)[:-1]
                 
                 # Add reasoning to scratchpad
-                st.session_state.agent_scratchpad.append("REASONING: Analyzing user request and determining appropriate response...")
+                lines.append("REASONING: Analyzing user request and determining appropriate response...")
+                
+                # Check the semantic cache for a near-identical recent exchange; IPs, hosts,
+                # ports and CVE ids must match exactly, so another target's answer is never replayed
+                active_llm = f"{self.llm_manager.active_provider}:{self.llm_manager.active_model}"
+                cache_text = self._response_cache_text(user_input, history)
+                cache_namespace = f"{active_llm}:{identifier_key(cache_text)}"
+                embedding = self._response_cache.embed(cache_text)
+                cached = self._response_cache.lookup(embedding, namespace=cache_namespace)
                 
-                # Generate response
-                response = self.llm_manager.generate_response(user_input, history)
+                speak = bool(self.voice_engine and
+                             st.session_state.api_keys_configured.get("elevenlabs", False))
+                
+                # Stream the response into the conversation as tokens arrive
+                with st.chat_message("assistant"):
+                    if cached:
+                        st.write(cached)
+                        content = cached
+                    else:
+                        chunks = self._iter_in_background(
+                            self.llm_manager.stream_response(
+                                user_input, history, session_id=st.session_state.session_id
+                            )
+                        )
+                        if speak:
+                            # Start speaking each sentence while the rest is still generating
+                            chunks = self._speak_as_streamed(chunks)
+                        # Raises if the stream fails part-way, so a truncated reply
+                        # is neither cached nor added to the history
+                        content = st.write_stream(chunks)
                 
-                if response:
+                if content:
+                    if not cached:
+                        self._response_cache.insert(embedding, content, namespace=cache_namespace)
+                    
                     # Add assistant response to conversation
-                    st.session_state.conversation_history.append({
-                        "role": "assistant",
-                        "content": response.content
-                    })
+                    message = {"role": "assistant", "content": content}
+                    st.session_state.conversation_history.append(message)
+                    st.session_state.llm_history.append(message)
                     
                     # Add to scratchpad
-                    st.session_state.agent_scratchpad.append(f"ACTION: Generated response using {response.provider}:{response.model}")
-                    st.session_state.agent_scratchpad.append(f"RESPONSE: {response.content[:100]}...")
+                    if cached:
+                        lines.append(f"ACTION: Served cached response for {active_llm}")
+                    else:
+                        lines.append(f"ACTION: Generated response using {active_llm}")
+                    lines.append(f"RESPONSE: {content[:100]}...")
                     
-                    # Generate TTS if configured
-                    if (self.voice_engine and 
-                        st.session_state.api_keys_configured.get("elevenlabs", False)):
-                        try:
-                            audio_data = self.voice_engine.text_to_speech(response.content)
-                            if audio_data:
-                                self.voice_engine.play_audio(audio_data)
-                        except Exception as e:
-                            logger.error(f"TTS error: {e}")
+                    # Cached replies were not streamed, so speak them whole
+                    if speak and cached:
+                        # Synthesize and play in the background so the reply renders immediately
+                        self._tts_pool.submit(self._speak, content)
                 else:
                     st.error("Failed to generate response")
-                    st.session_state.agent_scratchpad.append("ERROR: Failed to generate response")
+                    lines.append("ERROR: Failed to generate response")
                     
             except Exception as e:
                 st.error(f"Error processing input: {e}")
-                st.session_state.agent_scratchpad.append(f"ERROR: {str(e)}")
+                lines.append(f"ERROR: {str(e)}")
         else:
             st.warning("Please configure and select an LLM first")
         
+        self._scratchpad_add(*lines)
+        
         # Rerun to update the interface
-        st.rerun()
+        if not defer_rerun:
+            st.rerun()
+    
+    @staticmethod
+    def _response_cache_text(user_input: str, history: List[Dict[str, str]]) -> str:
+        """Build the text embedded as the response cache key."""
+        tail = history[-RESPONSE_CACHE_HISTORY_TAIL:] if RESPONSE_CACHE_HISTORY_TAIL else []
+        lines = [f"{msg['role']}: {msg['content']}" for msg in tail]
+        lines.append(f"user: {user_input}")
+        return "\n".join(lines)
+    
+    def _iter_in_background(self, chunks: Iterator[str]) -> Iterator[str]:
+        """
+        Drive a blocking chunk iterator on the LLM pool and yield its output here.
+        
+        An error raised by the iterator is re-raised here after the chunks
+        produced before it.
+        """
+        pending = queue.Queue()
+        
+        def _produce():
+            try:
+                for chunk in chunks:
+                    pending.put(chunk)
+            except Exception as e:
+                pending.put(e)
+            finally:
+                pending.put(None)
+        
+        self._llm_pool.submit(_produce)
+        while (chunk := pending.get()) is not None:
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+    
+    def _speak_as_streamed(self, chunks: Iterator[str]) -> Iterator[str]:
+        """Pass chunks through while the TTS pool speaks them sentence by sentence."""
+        pending = queue.Queue()
+        
+        def _speak_sentences():
+            try:
+                self.voice_engine.speak_stream(iter_sentences(iter(pending.get, None)))
+            except Exception as e:
+                logger.error(f"TTS error: {e}")
+        
+        self._tts_pool.submit(_speak_sentences)
+        try:
+            for chunk in chunks:
+                pending.put(chunk)
+                yield chunk
+        finally:
+            pending.put(None)
+    
+    def _speak(self, text: str):
+        """Synthesize and play text; runs on the TTS worker pool."""
+        try:
+            self.voice_engine.speak_stream(iter_sentences([text]))
+        except Exception as e:
+            logger.error(f"TTS error: {e}")
     
     def _start_auto_test(self, target: str):
         """Start autonomous testing workflow."""
-        st.session_state.agent_scratchpad.append(f"AUTO TEST: Starting autonomous test for target: {target}")
+        self._scratchpad_add(f"AUTO TEST: Starting autonomous test for target: {target}")
         
         # This would implement the full auto test workflow
         # For now, just add a placeholder
@@ -515,11 +705,6 @@ class GreyHatAI:
             
             # Render main interface
             self.render_main_interface()
-            
-            # Auto-refresh for voice input
-            if st.session_state.voice_listening:
-                time.sleep(0.1)
-                st.rerun()
                 
         except Exception as e:
             st.error(f"Application error: {e}")
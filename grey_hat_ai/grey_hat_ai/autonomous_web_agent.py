@@ -9,10 +9,17 @@ import os
 import logging
 import asyncio
 import base64
+import codecs
+import inspect
+import re
+import shutil
+import threading
+import uuid
 from typing import Dict, Any, List, Optional, Union
 from dataclasses import dataclass
 import json
 import tempfile
+from contextlib import asynccontextmanager
 
 try:
     from playwright.async_api import async_playwright, Browser, Page, BrowserContext
@@ -24,9 +31,219 @@ except ImportError:
     BrowserContext = None
     PlaywrightTimeoutError = Exception
 
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from markdownify import markdownify as html_to_markdown
+except ImportError:
+    try:
+        import html2text
+        html_to_markdown = html2text.html2text
+    except ImportError:
+        html_to_markdown = None
+
 logger = logging.getLogger(__name__)
 
 
+# Page text/HTML extraction, truncated in the page before crossing CDP
+_BODY_TEXT_JS = "maxChars => { const t = document.body ? document.body.innerText : ''; return maxChars == null ? t : t.slice(0, maxChars); }"
+_OUTER_HTML_JS = "maxChars => { const h = document.documentElement.outerHTML; return maxChars == null ? h : h.slice(0, maxChars); }"
+
+# Fills [selector, value] pairs and fires input/change events; returns
+# [selector, success, error] per pair. Uses the native value setter so
+# framework-controlled inputs (e.g. React) pick up the change.
+_FILL_FORM_JS = """
+pairs => pairs.map(([selector, value]) => {
+    try {
+        const el = document.querySelector(selector);
+        if (!el) return [selector, false, "not found"];
+        if (!("value" in el) || el.disabled || el.readOnly) return [selector, false, "not fillable"];
+        el.focus();
+        const setter = Object.getOwnPropertyDescriptor(Object.getPrototypeOf(el), "value")?.set;
+        if (setter) setter.call(el, value); else el.value = value;
+        el.dispatchEvent(new Event("input", {bubbles: true}));
+        el.dispatchEvent(new Event("change", {bubbles: true}));
+        return [selector, true, null];
+    } catch (e) {
+        return [selector, false, String(e)];
+    }
+})
+"""
+
+# Submit button candidates tried by fill_form, in order, as
+# (Playwright selector, CSS selector or None, button text or None)
+SUBMIT_SELECTORS = [
+    ("input[type='submit']", "input[type='submit']", None),
+    ("button[type='submit']", "button[type='submit']", None),
+    ("button:has-text('Submit')", None, "Submit"),
+    ("button:has-text('Send')", None, "Send"),
+    ("button:has-text('Login')", None, "Login"),
+    ("input[value*='Submit']", "input[value*='Submit']", None),
+]
+
+# Returns the Playwright selector of the first visible, enabled submit candidate
+_FIND_SUBMIT_JS = """
+candidates => {
+    const usable = el => el && !el.disabled && el.getClientRects().length > 0;
+    for (const [selector, css, text] of candidates) {
+        if (css) {
+            if (usable(document.querySelector(css))) return selector;
+        } else {
+            const needle = text.toLowerCase();
+            for (const button of document.querySelectorAll("button")) {
+                if (button.textContent.toLowerCase().includes(needle) && usable(button)) return selector;
+            }
+        }
+    }
+    return null;
+}
+"""
+
+# Maps a NodeList to the element summaries returned by find_elements
+_FIND_ELEMENTS_JS = """
+els => els.map((el, index) => {
+    const tag = el.tagName.toLowerCase();
+    const rect = el.getBoundingClientRect();
+    const attributes = {};
+    for (const attr of el.attributes) {
+        attributes[attr.name] = attr.value;
+    }
+    return {
+        index,
+        tag,
+        text: el.innerText ?? el.textContent ?? "",
+        visible: rect.width > 0 && rect.height > 0 && getComputedStyle(el).visibility !== "hidden",
+        enabled: ["input", "button", "select", "textarea"].includes(tag) ? !el.disabled : true,
+        attributes
+    };
+})
+"""
+
+
+# Agent methods callable as run_batch() steps, by step "action"
+BATCH_ACTIONS = {
+    "navigate": "navigate",
+    "fetch": "navigate_fast",
+    "get_content": "get_page_content",
+    "find_elements": "find_elements",
+    "click": "click_element",
+    "fill_form": "fill_form",
+    "wait_for_element": "wait_for_element",
+    "execute_js": "execute_javascript",
+    "screenshot": "take_screenshot",
+}
+
+
+# Minimum visible text (after stripping markup) for HTML to be served without the browser
+_STATIC_HTML_MIN_TEXT = 200
+_SCRIPT_STYLE_RE = re.compile(r"<(script|style|noscript)\b.*?</\1>", re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r"<[^>]+>")
+
+# Default content cap for page text/fetch results handed back to the LLM;
+# pass max_chars=None to get everything
+DEFAULT_MAX_CHARS = 50000
+
+# Media type fragments of bodies navigate_fast() returns as text
+_TEXT_MEDIA_TYPES = ("text/", "json", "xml", "javascript", "ecmascript", "x-www-form-urlencoded")
+
+
+def _needs_javascript(html: str) -> bool:
+    """Guess whether an HTML document only renders its content with JavaScript."""
+    text = _TAG_RE.sub(" ", _SCRIPT_STYLE_RE.sub(" ", html))
+    return len(" ".join(text.split())) < _STATIC_HTML_MIN_TEXT
+
+
+def _is_text_content(content_type: str) -> bool:
+    """Whether a Content-Type header names a textual body; a missing one is assumed textual."""
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return not media_type or any(fragment in media_type for fragment in _TEXT_MEDIA_TYPES)
+
+
+async def _read_text(response, max_chars: Optional[int]) -> tuple:
+    """Decode a streamed httpx response, reading no further than max_chars characters; returns (text, truncated)."""
+    decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+    parts = []
+    length = 0
+    async for chunk in response.aiter_bytes():
+        text = decoder.decode(chunk)
+        parts.append(text)
+        length += len(text)
+        if max_chars is not None and length > max_chars:
+            return "".join(parts)[:max_chars], True
+    parts.append(decoder.decode(b"", final=True))
+    text = "".join(parts)
+    if max_chars is not None and len(text) > max_chars:
+        return text[:max_chars], True
+    return text, False
+
+
+def _to_json(result: Any) -> str:
+    """Serialize a tool result as indented JSON, using orjson when installed."""
+    if orjson:
+        try:
+            return orjson.dumps(result, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY).decode()
+        except TypeError:
+            # e.g. non-string dict keys, which the stdlib encoder accepts
+            pass
+    return json.dumps(result, indent=2)
+
+
+def _from_json(data: str) -> Any:
+    """Parse JSON tool input, using orjson when installed."""
+    return orjson.loads(data) if orjson else json.loads(data)
+
+
+class _NoStackInspect:
+    """Stand-in for the inspect module whose stack() returns no frames."""
+    
+    def __getattr__(self, name):
+        return getattr(inspect, name)
+    
+    @staticmethod
+    def stack(*args, **kwargs):
+        return []
+
+
+def _disable_playwright_stack_capture():
+    """
+    Stop Playwright from calling inspect.stack() on every API call.
+    
+    Playwright walks the Python stack on each call (goto, click, fill,
+    evaluate, ...) to annotate errors, which can account for a large share
+    of CPU on hot paths. With this patch applied, Playwright error
+    tracebacks no longer include the Python caller frames.
+    """
+    try:
+        from playwright._impl import _connection
+        _connection.inspect = _NoStackInspect()
+        logger.info("Playwright stack capture disabled (PW_INSPECT_STACK=0)")
+    except Exception as e:
+        logger.warning(f"Could not disable Playwright stack capture: {e}")
+
+
+if async_playwright and os.environ.get("PW_INSPECT_STACK") == "0":
+    _disable_playwright_stack_capture()
+
+
 @dataclass
 class WebAgentConfig:
     """Configuration for the autonomous web agent."""
@@ -44,6 +261,7 @@ class WebAgentConfig:
     # Performance settings
     disable_images: bool = False
     disable_javascript: bool = False
+    pool_size: int = 4  # max browser contexts for concurrent work, opened on first use
 
 
 class AutonomousWebAgent:
@@ -65,6 +283,17 @@ class AutonomousWebAgent:
         self.context = None
         self.page = None
         self._is_initialized = False
+        self._owns_browser = True
+        self._context_pool: Optional[asyncio.Queue] = None  # idle pooled contexts
+        self._pool_opened = 0  # pooled contexts opened so far, idle or borrowed
+        self._http = None  # httpx.AsyncClient for requests that don't need the browser
+        self._screenshot_dir: Optional[str] = None  # where screenshots without a path are kept
+        
+        # ElementHandles resolved for (url, selector), valid until the DOM is mutated
+        self._selector_cache: Dict[tuple, Any] = {}
+        
+        # (title, url) of the current page, valid until the DOM is mutated
+        self._page_info: Optional[tuple] = None
     
     async def initialize(self) -> bool:
         """
@@ -85,19 +314,23 @@ class AutonomousWebAgent:
             
             # Launch browser
             if self.config.browser_type == "chromium":
+                flags = [
+                    ("--no-sandbox", True),
+                    ("--disable-dev-shm-usage", True),
+                    ("--disable-web-security", self.config.disable_web_security),
+                    ("--ignore-certificate-errors", self.config.ignore_https_errors),
+                    # Block images in the renderer instead of aborting each request from Python
+                    ("--blink-settings=imagesEnabled=false", self.config.disable_images)
+                ]
                 self.browser = await self.playwright.chromium.launch(
                     headless=self.config.headless,
-                    args=[
-                        "--no-sandbox",
-                        "--disable-dev-shm-usage",
-                        "--disable-gpu",
-                        "--disable-web-security" if self.config.disable_web_security else "",
-                        "--ignore-certificate-errors" if self.config.ignore_https_errors else ""
-                    ]
+                    chromium_sandbox=False,
+                    args=[flag for flag, enabled in flags if enabled]
                 )
             elif self.config.browser_type == "firefox":
                 self.browser = await self.playwright.firefox.launch(
-                    headless=self.config.headless
+                    headless=self.config.headless,
+                    firefox_user_prefs={"permissions.default.image": 2} if self.config.disable_images else None
                 )
             elif self.config.browser_type == "webkit":
                 self.browser = await self.playwright.webkit.launch(
@@ -106,20 +339,25 @@ class AutonomousWebAgent:
             else:
                 raise ValueError(f"Unsupported browser type: {self.config.browser_type}")
             
-            # Create context
-            self.context = await self.browser.new_context(
-                viewport={"width": self.config.viewport_width, "height": self.config.viewport_height},
-                user_agent=self.config.user_agent,
-                ignore_https_errors=self.config.ignore_https_errors
-            )
+            # Create the primary context and page
+            self.context = await self._new_context()
+            self.page = self.context.pages[0]
             
-            # Configure context
-            if self.config.disable_images:
-                await self.context.route("**/*.{png,jpg,jpeg,gif,svg,webp}", lambda route: route.abort())
+            # Isolated contexts for concurrent work are opened on demand by acquire_context()
+            self._context_pool = asyncio.Queue()
+            self._pool_opened = 0
             
-            # Create page
-            self.page = await self.context.new_page()
-            await self.page.set_default_timeout(self.config.timeout)
+            # Shared HTTP client so static fetches reuse pooled connections
+            if httpx:
+                self._http = httpx.AsyncClient(
+                    http2=_HTTP2_AVAILABLE,
+                    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+                    timeout=self.config.timeout / 1000,
+                    verify=not self.config.ignore_https_errors,
+                    headers={"User-Agent": self.config.user_agent}
+                )
+            
+            self._screenshot_dir = tempfile.mkdtemp(prefix="gha_")
             
             self._is_initialized = True
             logger.info("Web agent initialized successfully")
@@ -130,9 +368,116 @@ class AutonomousWebAgent:
             await self.cleanup()
             return False
     
+    async def _new_context(self) -> "BrowserContext":
+        """Create a configured browser context with one open page."""
+        context = await self.browser.new_context(
+            viewport={"width": self.config.viewport_width, "height": self.config.viewport_height},
+            user_agent=self.config.user_agent,
+            ignore_https_errors=self.config.ignore_https_errors,
+            java_script_enabled=not self.config.disable_javascript
+        )
+        
+        # WebKit has no launch-level image switch, so abort image requests instead
+        if self.config.disable_images and self.config.browser_type == "webkit":
+            await context.route("**/*.{png,jpg,jpeg,gif,svg,webp}", lambda route: route.abort())
+        
+        page = await context.new_page()
+        page.set_default_timeout(self.config.timeout)
+        return context
+    
+    async def acquire_context(self) -> "BrowserContext":
+        """
+        Borrow a browser context from the pool.
+        
+        Reuses an idle context, opens a new one while fewer than
+        ``config.pool_size`` exist, and otherwise waits until one is free.
+        Operate on ``context.pages[0]`` and hand it back with release_context().
+        """
+        if not self._is_initialized:
+            await self.initialize()
+        if self._context_pool.empty() and self._pool_opened < max(self.config.pool_size, 1):
+            # Counted before the await so concurrent callers can't overshoot the limit
+            self._pool_opened += 1
+            try:
+                return await self._new_context()
+            except Exception:
+                self._pool_opened -= 1
+                raise
+        return await self._context_pool.get()
+    
+    async def release_context(self, context: "BrowserContext"):
+        """Reset a borrowed context and return it to the pool."""
+        try:
+            await context.clear_cookies()
+            await context.pages[0].goto("about:blank")
+        except Exception as e:
+            logger.warning(f"Error resetting pooled context: {e}")
+        self._context_pool.put_nowait(context)
+    
+    @asynccontextmanager
+    async def pooled_session(self):
+        """
+        Borrow a pooled context as an AutonomousWebAgent of its own.
+        
+        The session shares this agent's browser but has its own cookies and
+        page, so several sessions can navigate and interact concurrently::
+        
+            async with agent.pooled_session() as session:
+                await session.navigate(url)
+        """
+        context = await self.acquire_context()
+        session = AutonomousWebAgent(self.config)
+        session.playwright = self.playwright
+        session.browser = self.browser
+        session.context = context
+        session.page = context.pages[0]
+        session._http = self._http
+        session._screenshot_dir = self._screenshot_dir
+        session._is_initialized = True
+        session._owns_browser = False
+        try:
+            yield session
+        finally:
+            await self.release_context(context)
+    
+    async def _act(self, action: str, selector: str, *args, **kwargs):
+        """
+        Run a page action on a selector, preferring a cached ElementHandle.
+        
+        Falls back to the selector-based page method when there is no cached
+        handle or the cached one has gone stale (detached or re-rendered).
+        """
+        key = (self.page.url, selector)
+        handle = self._selector_cache.get(key)
+        if handle is not None:
+            try:
+                return await getattr(handle, action)(*args, **kwargs)
+            except Exception:
+                self._selector_cache.pop(key, None)
+        return await getattr(self.page, action)(selector, *args, **kwargs)
+    
+    def _invalidate_dom(self):
+        """Forget cached element handles and page info after an action that may mutate the DOM."""
+        self._selector_cache.clear()
+        self._page_info = None
+    
+    async def _get_page_info(self) -> tuple:
+        """Return the page's (title, url), fetching the title only when not cached."""
+        # page.url is tracked locally (no round-trip), so a navigation the agent
+        # did not make, e.g. a redirect, still misses the cache
+        if self._page_info is None or self._page_info[1] != self.page.url:
+            self._page_info = (await self.page.title(), self.page.url)
+        return self._page_info
+    
     async def cleanup(self):
         """Clean up browser resources."""
+        if not self._owns_browser:
+            # Pooled sessions are returned to their owner, not torn down
+            return
+        
         try:
+            if self._http:
+                await self._http.aclose()
             if self.page:
                 await self.page.close()
             if self.context:
@@ -144,19 +489,27 @@ class AutonomousWebAgent:
         except Exception as e:
             logger.error(f"Error during cleanup: {e}")
         finally:
+            if self._screenshot_dir:
+                shutil.rmtree(self._screenshot_dir, ignore_errors=True)
             self._is_initialized = False
             self.page = None
             self.context = None
             self.browser = None
             self.playwright = None
+            self._context_pool = None
+            self._pool_opened = 0
+            self._http = None
+            self._screenshot_dir = None
+            self._invalidate_dom()
     
-    async def navigate(self, url: str, wait_for: str = "load") -> Dict[str, Any]:
+    async def navigate(self, url: str, wait_for: str = "load", include_headers: bool = False) -> Dict[str, Any]:
         """
         Navigate to a URL.
         
         Args:
             url: URL to navigate to
             wait_for: What to wait for ("load", "domcontentloaded", "networkidle")
+            include_headers: Whether to include the response headers
             
         Returns:
             Dictionary with navigation result
@@ -165,15 +518,20 @@ class AutonomousWebAgent:
             await self.initialize()
         
         try:
+            self._invalidate_dom()
             response = await self.page.goto(url, wait_until=wait_for)
+            title, current_url = await self._get_page_info()
             
-            return {
+            result = {
                 "success": True,
-                "url": self.page.url,
-                "title": await self.page.title(),
-                "status": response.status if response else None,
-                "headers": dict(response.headers) if response else None
+                "url": current_url,
+                "title": title,
+                "status": response.status if response else None
             }
+            if include_headers:
+                result["headers"] = response.headers if response else None
+            
+            return result
             
         except Exception as e:
             logger.error(f"Navigation error: {e}")
@@ -183,12 +541,78 @@ class AutonomousWebAgent:
                 "url": url
             }
     
-    async def get_page_content(self, content_type: str = "text") -> Dict[str, Any]:
+    async def navigate_fast(self, url: str, max_chars: Optional[int] = DEFAULT_MAX_CHARS) -> Dict[str, Any]:
+        """
+        Fetch a URL over plain HTTP, falling back to the browser when needed.
+        
+        Static resources (robots.txt, sitemaps, JSON endpoints) and HTML that
+        already carries its text are served by the shared HTTP client without
+        touching the browser. Pages that look like a JavaScript shell are
+        loaded with navigate() instead. Check the "via" field: an "http"
+        result does not change the browser page.
+        
+        The body is read only up to max_chars characters. Binary bodies
+        (images, archives, PDFs) are not read at all: the result carries their
+        metadata and "content" is None.
+        
+        Args:
+            url: URL to fetch
+            max_chars: Read and return at most this many characters of the body
+                (defaults to DEFAULT_MAX_CHARS, None for no limit)
+            
+        Returns:
+            Dictionary with fetch result
+        """
+        if not self._is_initialized:
+            await self.initialize()
+        
+        if self._http is None:
+            return await self._navigate_via_browser(url)
+        
+        try:
+            async with self._http.stream("GET", url, follow_redirects=True) as response:
+                content_type = response.headers.get("content-type", "")
+                result = {
+                    "success": True,
+                    "via": "http",
+                    "url": str(response.url),
+                    "status": response.status_code,
+                    "content_type": content_type
+                }
+                
+                if not _is_text_content(content_type):
+                    result["content"] = None
+                    result["content_length"] = response.headers.get("content-length")
+                    return result
+                
+                content, truncated = await _read_text(response, max_chars)
+            
+        except Exception as e:
+            logger.warning(f"HTTP fetch failed, falling back to browser: {e}")
+            return await self._navigate_via_browser(url)
+        
+        if "html" in content_type and _needs_javascript(content):
+            return await self._navigate_via_browser(url)
+        
+        result["content"] = content
+        result["truncated"] = truncated
+        return result
+    
+    async def _navigate_via_browser(self, url: str) -> Dict[str, Any]:
+        """navigate() with the result tagged for navigate_fast callers."""
+        result = await self.navigate(url)
+        result["via"] = "browser"
+        return result
+    
+    async def get_page_content(self, content_type: str = "text", max_chars: Optional[int] = DEFAULT_MAX_CHARS) -> Dict[str, Any]:
         """
         Extract page content.
         
         Args:
             content_type: Type of content to extract ("text", "html", "markdown")
+            max_chars: Truncate the extracted text/HTML in the page, before it is
+                transferred, to at most this many characters (defaults to DEFAULT_MAX_CHARS,
+                None for no limit)
             
         Returns:
             Dictionary with extracted content
@@ -197,20 +621,29 @@ class AutonomousWebAgent:
             return {"success": False, "error": "Page not initialized"}
         
         try:
+            title, current_url = await self._get_page_info()
             result = {
                 "success": True,
-                "url": self.page.url,
-                "title": await self.page.title()
+                "url": current_url,
+                "title": title
             }
             
             if content_type == "text":
-                result["content"] = await self.page.inner_text("body")
+                result["content"] = await self.page.evaluate(_BODY_TEXT_JS, max_chars)
             elif content_type == "html":
-                result["content"] = await self.page.content()
+                if max_chars is None:
+                    result["content"] = await self.page.content()
+                else:
+                    result["content"] = await self.page.evaluate(_OUTER_HTML_JS, max_chars)
             elif content_type == "markdown":
-                # Simple HTML to markdown conversion
-                text = await self.page.inner_text("body")
-                result["content"] = text
+                if html_to_markdown:
+                    html = await self.page.evaluate(_OUTER_HTML_JS, None)
+                    # Conversion is CPU-bound; keep it off the event loop
+                    markdown = await asyncio.to_thread(html_to_markdown, html)
+                    result["content"] = markdown[:max_chars] if max_chars is not None else markdown
+                else:
+                    # No converter installed, fall back to plain text
+                    result["content"] = await self.page.evaluate(_BODY_TEXT_JS, max_chars)
             else:
                 raise ValueError(f"Unsupported content type: {content_type}")
             
@@ -235,36 +668,8 @@ class AutonomousWebAgent:
             return {"success": False, "error": "Page not initialized"}
         
         try:
-            elements = await self.page.query_selector_all(selector)
-            
-            element_data = []
-            for i, element in enumerate(elements):
-                try:
-                    element_info = {
-                        "index": i,
-                        "tag": await element.evaluate("el => el.tagName.toLowerCase()"),
-                        "text": await element.inner_text(),
-                        "visible": await element.is_visible(),
-                        "enabled": await element.is_enabled() if await element.evaluate("el => el.tagName.toLowerCase()") in ["input", "button", "select", "textarea"] else True
-                    }
-                    
-                    # Get attributes
-                    attributes = await element.evaluate("""
-                        el => {
-                            const attrs = {};
-                            for (let attr of el.attributes) {
-                                attrs[attr.name] = attr.value;
-                            }
-                            return attrs;
-                        }
-                    """)
-                    element_info["attributes"] = attributes
-                    
-                    element_data.append(element_info)
-                    
-                except Exception as e:
-                    logger.warning(f"Error processing element {i}: {e}")
-                    continue
+            # Read every matched element's properties in a single round-trip
+            element_data = await self.page.eval_on_selector_all(selector, _FIND_ELEMENTS_JS)
             
             return {
                 "success": True,
@@ -291,7 +696,10 @@ class AutonomousWebAgent:
             return {"success": False, "error": "Page not initialized"}
         
         try:
-            await self.page.click(selector, timeout=timeout)
+            try:
+                await self._act("click", selector, timeout=timeout)
+            finally:
+                self._invalidate_dom()
             
             return {
                 "success": True,
@@ -319,15 +727,23 @@ class AutonomousWebAgent:
             return {"success": False, "error": "Page not initialized"}
         
         try:
-            filled_fields = []
+            # Fast path: fill every field in a single evaluate
+            try:
+                batch = await self.page.evaluate(_FILL_FORM_JS, list(form_data.items()))
+            except Exception as e:
+                logger.warning(f"Batch form fill failed, filling fields individually: {e}")
+                batch = [[selector, False, None] for selector in form_data]
             
-            for selector, value in form_data.items():
-                try:
-                    await self.page.fill(selector, value)
+            # Missing, non-CSS or non-fillable in the fast path; let Playwright fill
+            # those one at a time, since each fill moves the page's single focus
+            filled_fields = []
+            for (selector, ok, _), value in zip(batch, form_data.values()):
+                if ok:
                     filled_fields.append({"selector": selector, "value": value, "success": True})
-                except Exception as e:
-                    filled_fields.append({"selector": selector, "value": value, "success": False, "error": str(e)})
-                    logger.warning(f"Failed to fill field {selector}: {e}")
+                else:
+                    filled_fields.append(await self._safe_fill(selector, value))
+            
+            self._invalidate_dom()
             
             result = {
                 "success": True,
@@ -337,27 +753,13 @@ class AutonomousWebAgent:
             
             if submit:
                 try:
-                    # Try to find and click submit button
-                    submit_selectors = [
-                        "input[type='submit']",
-                        "button[type='submit']",
-                        "button:has-text('Submit')",
-                        "button:has-text('Send')",
-                        "button:has-text('Login')",
-                        "input[value*='Submit']"
-                    ]
-                    
-                    submitted = False
-                    for submit_selector in submit_selectors:
-                        try:
-                            await self.page.click(submit_selector, timeout=2000)
-                            result["submitted"] = True
-                            submitted = True
-                            break
-                        except:
-                            continue
+                    # Find the first usable submit button in one DOM scan, then click it
+                    submit_selector = await self.page.evaluate(_FIND_SUBMIT_JS, SUBMIT_SELECTORS)
                     
-                    if not submitted:
+                    if submit_selector:
+                        await self.page.click(submit_selector, timeout=2000)
+                        result["submitted"] = True
+                    else:
                         # Try pressing Enter on the last filled field
                         if filled_fields:
                             last_field = filled_fields[-1]["selector"]
@@ -370,6 +772,8 @@ class AutonomousWebAgent:
                 except Exception as e:
                     result["submitted"] = False
                     result["submit_error"] = str(e)
+                finally:
+                    self._invalidate_dom()
             
             return result
             
@@ -377,13 +781,30 @@ class AutonomousWebAgent:
             logger.error(f"Form filling error: {e}")
             return {"success": False, "error": str(e)}
     
-    async def take_screenshot(self, full_page: bool = False, path: str = None) -> Dict[str, Any]:
+    async def _safe_fill(self, selector: str, value: str) -> Dict[str, Any]:
+        """Fill one field with Playwright, reporting failure instead of raising."""
+        try:
+            await self._act("fill", selector, value)
+            return {"selector": selector, "value": value, "success": True}
+        except Exception as e:
+            logger.warning(f"Failed to fill field {selector}: {e}")
+            return {"selector": selector, "value": value, "success": False, "error": str(e)}
+    
+    async def take_screenshot(self,
+                              full_page: bool = False,
+                              path: str = None,
+                              include_base64: bool = False,
+                              format: str = "png",
+                              quality: int = 70) -> Dict[str, Any]:
         """
         Take a screenshot of the page.
         
         Args:
             full_page: Whether to capture the full page
             path: Path to save screenshot (optional)
+            include_base64: Whether to embed the image as base64 in the result
+            format: Image format ("png" or "jpeg"; JPEG is typically much smaller)
+            quality: JPEG quality (0-100), ignored for PNG
             
         Returns:
             Dictionary with screenshot result
@@ -392,24 +813,33 @@ class AutonomousWebAgent:
             return {"success": False, "error": "Page not initialized"}
         
         try:
-            if path is None:
-                # Create temporary file
-                with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp_file:
-                    path = tmp_file.name
+            if format not in ("png", "jpeg"):
+                raise ValueError(f"Unsupported screenshot format: {format}")
             
-            await self.page.screenshot(path=path, full_page=full_page)
+            options = {"full_page": full_page, "type": format}
+            if format == "jpeg":
+                options["quality"] = quality
             
-            # Read screenshot as base64 for embedding
-            with open(path, "rb") as f:
-                screenshot_data = base64.b64encode(f.read()).decode()
+            if path is None and not include_base64:
+                # Nothing would be returned otherwise, so keep the image in the agent's
+                # temporary directory (removed by cleanup()); Playwright writes the file
+                path = os.path.join(self._screenshot_dir or tempfile.gettempdir(), f"{uuid.uuid4().hex}.{format}")
             
-            return {
+            # The image bytes come back in memory; Playwright also writes them to path if given
+            data = await self.page.screenshot(path=path, **options)
+            
+            result = {
                 "success": True,
                 "path": path,
-                "base64": screenshot_data,
+                "size": len(data),
+                "format": format,
                 "url": self.page.url,
                 "full_page": full_page
             }
+            if include_base64:
+                result["base64"] = base64.b64encode(data).decode("ascii")
+            
+            return result
             
         except Exception as e:
             logger.error(f"Screenshot error: {e}")
@@ -429,6 +859,7 @@ class AutonomousWebAgent:
             return {"success": False, "error": "Page not initialized"}
         
         try:
+            self._invalidate_dom()
             result = await self.page.evaluate(script)
             
             return {
@@ -458,7 +889,10 @@ class AutonomousWebAgent:
             return {"success": False, "error": "Page not initialized"}
         
         try:
-            await self.page.wait_for_selector(selector, timeout=timeout, state=state)
+            handle = await self.page.wait_for_selector(selector, timeout=timeout, state=state)
+            if handle is not None:
+                # Reuse the resolved handle for a follow-up click/fill on this selector
+                self._selector_cache[(self.page.url, selector)] = handle
             
             return {
                 "success": True,
@@ -478,6 +912,64 @@ class AutonomousWebAgent:
             logger.error(f"Wait for element error: {e}")
             return {"success": False, "error": str(e), "selector": selector}
     
+    async def run_batch(self,
+                        steps: List[Dict[str, Any]],
+                        include_content: bool = False,
+                        include_screenshot: bool = False) -> List[Dict[str, Any]]:
+        """
+        Run a sequence of actions in one call.
+        
+        Each step is a dictionary with an "action" (a key of BATCH_ACTIONS)
+        and the keyword arguments of the matching method, e.g.
+        ``{"action": "click", "selector": "#login"}``. Steps run in order and
+        the batch stops at the first failing step.
+        
+        Args:
+            steps: Actions to run
+            include_content: Add the page text to the last step's result
+            include_screenshot: Add a base64 screenshot to the last step's result
+            
+        Returns:
+            One result per step run: {"ok": True} for intermediate steps, the
+            full result for the last step and for a failing step
+        """
+        if not self._is_initialized:
+            await self.initialize()
+        
+        results = []
+        for i, step in enumerate(steps):
+            step = dict(step)
+            action = step.pop("action", None)
+            method = BATCH_ACTIONS.get(action)
+            if method is None:
+                results.append({"success": False, "error": f"Unsupported action: {action}", "step": i})
+                break
+            
+            try:
+                result = await getattr(self, method)(**step)
+            except TypeError as e:
+                # Bad arguments for the action
+                result = {"success": False, "error": str(e)}
+            
+            if not result.get("success"):
+                result["step"] = i
+                results.append(result)
+                break
+            
+            if i < len(steps) - 1:
+                results.append({"ok": True})
+                continue
+            
+            if include_content:
+                content = await self.get_page_content()
+                result["content"] = content.get("content")
+            if include_screenshot:
+                screenshot = await self.take_screenshot(include_base64=True)
+                result["screenshot"] = screenshot.get("base64")
+            results.append(result)
+        
+        return results
+    
     async def get_cookies(self) -> Dict[str, Any]:
         """Get all cookies for the current page."""
         if not self.context:
@@ -520,95 +1012,187 @@ class AutonomousWebAgent:
         }
 
 
+# Persistent event loop shared by the sync tool wrappers. The browser outlives
+# any single tool call, so it must stay bound to one long-running loop instead
+# of a fresh asyncio.run() loop per call.
+_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_LOOP_LOCK = threading.Lock()
+
+
+def _uvloop_supported() -> bool:
+    """
+    Whether the background loop should run on uvloop.
+    
+    Requires uvloop and Playwright >= 1.15 (older releases hang on uvloop's
+    subprocess pipes). Set GHA_DISABLE_UVLOOP=1 to keep the stdlib loop.
+    """
+    if uvloop is None or os.environ.get("GHA_DISABLE_UVLOOP") == "1":
+        return False
+    try:
+        from importlib.metadata import version
+        major, minor = (int(part) for part in version("playwright").split(".")[:2])
+        return (major, minor) >= (1, 15)
+    except Exception:
+        return False
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """
+    Get the background event loop, starting its thread on first use.
+    
+    The loop is created directly rather than through the event loop policy,
+    so callers changing the policy later does not affect it.
+    """
+    global _LOOP
+    with _LOOP_LOCK:
+        if _LOOP is None:
+            loop = uvloop.new_event_loop() if _uvloop_supported() else asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="web-agent-loop", daemon=True).start()
+            _LOOP = loop
+    return _LOOP
+
+
+def _run_sync(coro):
+    """Run a coroutine on the background event loop and block for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result()
+
+
 # CAI Tool Integration
 def create_web_agent_tool():
     """Create a CAI tool for the autonomous web agent."""
     
     # Global web agent instance
     _web_agent = None
+    _web_agent_lock = None
     
     async def get_web_agent():
-        nonlocal _web_agent
-        if _web_agent is None:
-            _web_agent = AutonomousWebAgent()
-            await _web_agent.initialize()
+        nonlocal _web_agent, _web_agent_lock
+        # Created here so the lock belongs to the background loop
+        if _web_agent_lock is None:
+            _web_agent_lock = asyncio.Lock()
+        async with _web_agent_lock:
+            if _web_agent is None:
+                _web_agent = AutonomousWebAgent()
+                await _web_agent.initialize()
         return _web_agent
     
-    def web_navigate(url: str, wait_for: str = "load") -> str:
+    def web_navigate(url: str, wait_for: str = "load", include_headers: bool = False) -> str:
         """Navigate to a URL and return page information."""
         async def _navigate():
             agent = await get_web_agent()
-            result = await agent.navigate(url, wait_for)
-            return json.dumps(result, indent=2)
+            result = await agent.navigate(url, wait_for, include_headers)
+            return _to_json(result)
         
-        return asyncio.run(_navigate())
+        return _run_sync(_navigate())
     
-    def web_get_content(content_type: str = "text") -> str:
+    def web_get_content(content_type: str = "text", max_chars: Optional[int] = DEFAULT_MAX_CHARS) -> str:
         """Extract content from the current page."""
         async def _get_content():
             agent = await get_web_agent()
-            result = await agent.get_page_content(content_type)
-            return json.dumps(result, indent=2)
+            result = await agent.get_page_content(content_type, max_chars)
+            return _to_json(result)
         
-        return asyncio.run(_get_content())
+        return _run_sync(_get_content())
+    
+    def web_fetch(url: str, max_chars: Optional[int] = DEFAULT_MAX_CHARS) -> str:
+        """Fetch a URL over plain HTTP (robots.txt, sitemaps, APIs), using the browser only for JavaScript-rendered pages."""
+        async def _fetch():
+            agent = await get_web_agent()
+            result = await agent.navigate_fast(url, max_chars)
+            return _to_json(result)
+        
+        return _run_sync(_fetch())
     
     def web_find_elements(selector: str) -> str:
         """Find elements on the page using CSS selector."""
         async def _find_elements():
             agent = await get_web_agent()
             result = await agent.find_elements(selector)
-            return json.dumps(result, indent=2)
+            return _to_json(result)
         
-        return asyncio.run(_find_elements())
+        return _run_sync(_find_elements())
     
     def web_click(selector: str) -> str:
         """Click an element on the page."""
         async def _click():
             agent = await get_web_agent()
             result = await agent.click_element(selector)
-            return json.dumps(result, indent=2)
+            return _to_json(result)
         
-        return asyncio.run(_click())
+        return _run_sync(_click())
     
     def web_fill_form(form_data_json: str, submit: bool = False) -> str:
         """Fill a form with data. form_data_json should be a JSON string mapping selectors to values."""
         async def _fill_form():
             agent = await get_web_agent()
             try:
-                form_data = json.loads(form_data_json)
+                form_data = _from_json(form_data_json)
                 result = await agent.fill_form(form_data, submit)
-                return json.dumps(result, indent=2)
+                return _to_json(result)
             except json.JSONDecodeError as e:
-                return json.dumps({"success": False, "error": f"Invalid JSON: {e}"})
+                # orjson.JSONDecodeError subclasses json.JSONDecodeError
+                return _to_json({"success": False, "error": f"Invalid JSON: {e}"})
         
-        return asyncio.run(_fill_form())
+        return _run_sync(_fill_form())
     
-    def web_screenshot(full_page: bool = False, save_path: str = None) -> str:
+    def web_screenshot(full_page: bool = False, save_path: str = None, include_base64: bool = False) -> str:
         """Take a screenshot of the current page."""
         async def _screenshot():
             agent = await get_web_agent()
-            result = await agent.take_screenshot(full_page, save_path)
-            return json.dumps(result, indent=2)
+            result = await agent.take_screenshot(full_page, save_path, include_base64)
+            return _to_json(result)
         
-        return asyncio.run(_screenshot())
+        return _run_sync(_screenshot())
     
     def web_execute_js(script: str) -> str:
         """Execute JavaScript on the current page."""
         async def _execute_js():
             agent = await get_web_agent()
             result = await agent.execute_javascript(script)
-            return json.dumps(result, indent=2)
+            return _to_json(result)
+        
+        return _run_sync(_execute_js())
+    
+    def web_batch(steps_json: str) -> str:
+        """
+        Run several web actions in one call. steps_json is either a JSON list of steps or an
+        object {"steps": [...], "global_expectation": {"include_content": bool, "include_screenshot": bool}}.
+        Each step is {"action": <navigate|fetch|get_content|find_elements|click|fill_form|
+        wait_for_element|execute_js|screenshot>, ...arguments}. Only the last step returns a full result.
+        """
+        async def _batch():
+            agent = await get_web_agent()
+            try:
+                spec = _from_json(steps_json)
+            except json.JSONDecodeError as e:
+                return _to_json({"success": False, "error": f"Invalid JSON: {e}"})
+            
+            if isinstance(spec, list):
+                spec = {"steps": spec}
+            expectation = spec.get("global_expectation") or {}
+            results = await agent.run_batch(
+                spec.get("steps", []),
+                include_content=expectation.get("include_content", False),
+                include_screenshot=expectation.get("include_screenshot", False)
+            )
+            return _to_json({
+                "success": bool(results) and results[-1].get("success", False),
+                "steps_run": len(results),
+                "results": results
+            })
         
-        return asyncio.run(_execute_js())
+        return _run_sync(_batch())
     
     # Return tool functions that can be registered with CAI
     return {
         "web_navigate": web_navigate,
+        "web_fetch": web_fetch,
         "web_get_content": web_get_content,
         "web_find_elements": web_find_elements,
         "web_click": web_click,
         "web_fill_form": web_fill_form,
         "web_screenshot": web_screenshot,
-        "web_execute_js": web_execute_js
+        "web_execute_js": web_execute_js,
+        "web_batch": web_batch
     }
 
@@ -0,0 +1,106 @@
+"""
+Shared text embeddings for Grey Hat AI
+
+This module owns the process-wide sentence-transformers encoder:
+- one encoder per model name, loaded once and shared by every semantic cache
+- background warm-up so the first lookup does not pay the model load
+- batched, normalized embeddings (cosine similarity is a dot product)
+"""
+
+import functools
+import logging
+import threading
+from typing import List, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "all-MiniLM-L6-v2"
+
+_encoder_lock = threading.Lock()
+
+# Models that failed to load (e.g. offline with no local copy); not retried, since
+# every retry would block its caller until the download times out
+_failed_models = set()
+
+
+def available(model_name: str = DEFAULT_MODEL) -> bool:
+    """Whether the embedding backend is installed and the model has not failed to load."""
+    return SentenceTransformer is not None and np is not None and model_name not in _failed_models
+
+
+@functools.lru_cache(maxsize=None)
+def _load_encoder(model_name: str, device: Optional[str]):
+    logger.info(f"Loading embedding model: {model_name}")
+    return SentenceTransformer(model_name, device=device)
+
+
+def get_encoder(model_name: str = DEFAULT_MODEL, device: Optional[str] = None):
+    """
+    Get the shared encoder for a model, loading it on first use.
+
+    Args:
+        model_name: sentence-transformers model name
+        device: Torch device (optional, picks CUDA when available if not provided)
+
+    Returns:
+        SentenceTransformer instance, or None if sentence-transformers is not
+        installed or the model failed to load
+    """
+    # Serialized so a warm-up thread and a first lookup never load the model twice
+    with _encoder_lock:
+        if not available(model_name):
+            return None
+        try:
+            return _load_encoder(model_name, device)
+        except Exception as e:
+            logger.error(f"Failed to load embedding model {model_name}, semantic caching disabled: {e}")
+            _failed_models.add(model_name)
+            return None
+
+
+def embed_batch(texts: List[str], model_name: str = DEFAULT_MODEL) -> Optional["np.ndarray"]:
+    """
+    Embed several texts in one pass.
+
+    Args:
+        texts: Texts to embed
+        model_name: sentence-transformers model name
+
+    Returns:
+        float32 array of normalized vectors, one row per text, or None if
+        embeddings are unavailable
+    """
+    encoder = get_encoder(model_name)
+    if encoder is None:
+        return None
+    return encoder.encode(texts, batch_size=32, normalize_embeddings=True).astype(np.float32)
+
+
+def warm_up(model_name: str = DEFAULT_MODEL) -> Optional[threading.Thread]:
+    """
+    Load the encoder in a daemon thread.
+
+    Args:
+        model_name: sentence-transformers model name
+
+    Returns:
+        The loading thread, or None if embeddings are unavailable
+    """
+    if not available(model_name):
+        return None
+
+    thread = threading.Thread(
+        target=get_encoder, args=(model_name,), name="embedding-warmup", daemon=True
+    )
+    thread.start()
+    return thread
@@ -11,30 +11,209 @@ a consistent interface for the main application.
 """
 
 import os
+import asyncio
+import hashlib
 import logging
-from typing import List, Dict, Any, Optional, Union
+import socket
+import sqlite3
+import threading
+import weakref
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Union, Iterator, Callable, Awaitable
 from dataclasses import dataclass
 import json
+import random
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
 
 try:
     import google.generativeai as genai
 except ImportError:
     genai = None
 
+try:
+    from google.api_core import exceptions as google_exceptions
+except ImportError:
+    google_exceptions = None
+
 try:
     from mistralai.client import MistralClient
+    from mistralai.async_client import MistralAsyncClient
     from mistralai.models.chat_completion import ChatMessage
 except ImportError:
     MistralClient = None
+    MistralAsyncClient = None
     ChatMessage = None
 
 try:
-    from groq import Groq
+    from mistralai.exceptions import MistralConnectionException
+except ImportError:
+    MistralConnectionException = None
+
+try:
+    from groq import Groq, AsyncGroq
+    from groq import APIConnectionError as GroqConnectionError
 except ImportError:
     Groq = None
+    AsyncGroq = None
+    GroqConnectionError = None
+
+from grey_hat_ai import embeddings
+from grey_hat_ai.semantic_cache import SemanticCache, identifier_key
 
 logger = logging.getLogger(__name__)
 
+# Responses sampled above this temperature are not cached
+CACHE_MAX_TEMPERATURE = 0.3
+
+# Concurrent async requests allowed per provider (per event loop)
+ASYNC_CONCURRENCY = 4
+
+# Conversations whose provider-side state is kept for reuse; the least recently used is dropped
+MAX_CHAT_SESSIONS = 64
+
+# Connection settings for the HTTP clients handed to provider SDKs
+HTTP_LIMITS = {"max_connections": 64, "max_keepalive_connections": 32}
+HTTP_TIMEOUT = 60.0
+_TCP_NODELAY = [(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)]
+
+
+# Retry policy for provider calls
+MAX_RETRIES = 5
+RETRY_BASE_DELAY = 0.5  # seconds, doubled per attempt
+RETRY_MAX_DELAY = 30.0
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+# Network-level failures (no HTTP status) worth retrying
+_RETRYABLE_ERRORS = tuple(
+    error for error in (
+        TimeoutError,
+        ConnectionError,
+        GroqConnectionError,  # includes timeouts
+        MistralConnectionException,
+        httpx.TransportError if httpx else None,
+        google_exceptions.DeadlineExceeded if google_exceptions else None,
+    )
+    if error is not None
+)
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    """HTTP status of a provider SDK error: Groq status_code, Mistral http_status, Google code."""
+    for attr in ("status_code", "http_status", "code"):
+        value = getattr(error, attr, None)
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Whether an error is transient (rate limit, server error, timeout) rather than auth/validation."""
+    status = _status_code(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+    return isinstance(error, _RETRYABLE_ERRORS)
+
+
+def _retry_delay(error: Exception, attempt: int) -> float:
+    """Seconds to wait before the next attempt, honouring a Retry-After header."""
+    headers = getattr(error, "headers", None)
+    if headers is None and getattr(error, "response", None) is not None:
+        headers = getattr(error.response, "headers", None)
+    if headers:
+        try:
+            return min(float(headers.get("retry-after")), RETRY_MAX_DELAY)
+        except (TypeError, ValueError):
+            pass
+    
+    # Full jitter: uniform over [0, base * 2^attempt]
+    return random.uniform(0, min(RETRY_BASE_DELAY * 2 ** attempt, RETRY_MAX_DELAY))
+
+
+def _call_with_retry(fn: Callable[[], Any], max_retries: int = MAX_RETRIES) -> Any:
+    """Call fn, retrying transient provider errors with exponential backoff."""
+    for attempt in range(max_retries + 1):
+        try:
+            return fn()
+        except Exception as e:
+            if attempt == max_retries or not _is_retryable(e):
+                raise
+            delay = _retry_delay(e, attempt)
+            logger.warning(f"Retrying in {delay:.1f}s after transient error: {e}")
+            time.sleep(delay)
+
+
+async def _acall_with_retry(fn: Callable[[], Awaitable[Any]], max_retries: int = MAX_RETRIES) -> Any:
+    """Async variant of _call_with_retry; fn returns a fresh awaitable per attempt."""
+    for attempt in range(max_retries + 1):
+        try:
+            return await fn()
+        except Exception as e:
+            if attempt == max_retries or not _is_retryable(e):
+                raise
+            delay = _retry_delay(e, attempt)
+            logger.warning(f"Retrying in {delay:.1f}s after transient error: {e}")
+            await asyncio.sleep(delay)
+
+
+def _stream_with_retry(fn: Callable[[], Iterator[str]], max_retries: int = MAX_RETRIES) -> Iterator[str]:
+    """
+    Yield from the stream fn returns, retrying transient errors.
+    
+    Only failures before the first chunk are retried; once text has been
+    yielded a retry would repeat it, so later errors are raised.
+    """
+    for attempt in range(max_retries + 1):
+        started = False
+        try:
+            for chunk in fn():
+                started = True
+                yield chunk
+            return
+        except Exception as e:
+            if started or attempt == max_retries or not _is_retryable(e):
+                raise
+            delay = _retry_delay(e, attempt)
+            logger.warning(f"Retrying stream in {delay:.1f}s after transient error: {e}")
+            time.sleep(delay)
+
+
+def _pooled_http_client(async_client: bool = False):
+    """
+    Build an HTTP client for a provider SDK, or None if httpx is missing.
+    
+    Keeps connections alive across requests, negotiates HTTP/2 when h2 is
+    installed and disables Nagle's algorithm for small request bodies.
+    """
+    if httpx is None:
+        return None
+    
+    transport_class = httpx.AsyncHTTPTransport if async_client else httpx.HTTPTransport
+    client_class = httpx.AsyncClient if async_client else httpx.Client
+    return client_class(
+        transport=transport_class(
+            http2=_HTTP2_AVAILABLE,
+            limits=httpx.Limits(**HTTP_LIMITS),
+            socket_options=_TCP_NODELAY
+        ),
+        timeout=HTTP_TIMEOUT
+    )
+
 
 @dataclass
 class LLMResponse:
@@ -69,12 +248,39 @@ class LLMManager:
         }
     }
     
-    def __init__(self):
+    def __init__(self, cache_path: str = None, cache_max_entries: int = 1000):
+        """
+        Args:
+            cache_path: SQLite file persisting cached responses across sessions (optional)
+            cache_max_entries: Maximum number of cached responses
+        """
         self.active_provider = None
         self.active_model = None
         self.clients = {}
         self._api_keys = {}
         
+        # Response cache: exact prompt match first, then semantic match on the prompt
+        self._cache_max_entries = cache_max_entries
+        self._response_cache: "OrderedDict[str, LLMResponse]" = OrderedDict()
+        self._semantic_cache = SemanticCache(threshold=0.95, max_entries=cache_max_entries)
+        self._cache_lock = threading.Lock()
+        self._cache_db = self._open_cache_db(cache_path) if cache_path else None
+        
+        # Load the shared embedding model in the background so the first lookup doesn't wait on it
+        embeddings.warm_up(self._semantic_cache.model_name)
+        
+        # Gemini models and the chat session last used per (model, session id), with
+        # the (role, content) history it holds, so follow-up turns reuse it
+        self._gemini_models: Dict[str, Any] = {}
+        self._gemini_chats: Dict[tuple, tuple] = {}
+        
+        # Mistral/Groq messages already converted per (provider, session id), with
+        # the (role, content) history they hold, so follow-up turns only convert the new turn
+        self._converted_history: Dict[tuple, tuple] = {}
+        
+        # Async clients and rate-limit semaphores, per event loop since both bind to one
+        self._async_state: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, tuple]]" = weakref.WeakKeyDictionary()
+        
     def set_api_key(self, provider: str, api_key: str) -> bool:
         """
         Set API key for a specific provider.
@@ -91,17 +297,23 @@ class LLMManager:
             return False
             
         self._api_keys[provider] = api_key
+        for state in self._async_state.values():
+            state.pop(provider, None)
         
         try:
             if provider == "gemini" and genai:
                 genai.configure(api_key=api_key)
                 self.clients[provider] = genai
+                # Models bind the configured client on first use, so drop them with
+                # their sessions or they keep sending the previous key
+                self._gemini_models.clear()
+                self._gemini_chats.clear()
                 
             elif provider == "mistral" and MistralClient:
                 self.clients[provider] = MistralClient(api_key=api_key)
                 
             elif provider == "groq" and Groq:
-                self.clients[provider] = Groq(api_key=api_key)
+                self.clients[provider] = Groq(api_key=api_key, http_client=_pooled_http_client())
                 
             else:
                 logger.error(f"Provider {provider} not available (missing dependencies)")
@@ -147,7 +359,9 @@ class LLMManager:
                          prompt: str, 
                          history: List[Dict[str, str]] = None,
                          max_tokens: int = 4000,
-                         temperature: float = 0.7) -> Optional[LLMResponse]:
+                         temperature: float = 0.7,
+                         use_cache: bool = True,
+                         session_id: str = "default") -> Optional[LLMResponse]:
         """
         Generate a response using the active LLM.
         
@@ -156,6 +370,10 @@ class LLMManager:
             history: Conversation history in format [{"role": "user/assistant", "content": "..."}]
             max_tokens: Maximum tokens to generate
             temperature: Sampling temperature
+            use_cache: Serve and store near-deterministic responses (temperature
+                up to CACHE_MAX_TEMPERATURE) from the response cache
+            session_id: Conversation the history belongs to; follow-up turns in
+                the same session reuse the provider-side conversation state
             
         Returns:
             LLMResponse object or None if failed
@@ -166,35 +384,284 @@ class LLMManager:
             
         if history is None:
             history = []
+        
+        cacheable = use_cache and temperature <= CACHE_MAX_TEMPERATURE
+        if cacheable:
+            key, namespace, embedding, cached = self._cache_lookup(prompt, history, temperature)
+            if cached is not None:
+                return cached
             
         try:
             if self.active_provider == "gemini":
-                return self._generate_gemini(prompt, history, max_tokens, temperature)
+                generate = self._generate_gemini
             elif self.active_provider == "mistral":
-                return self._generate_mistral(prompt, history, max_tokens, temperature)
+                generate = self._generate_mistral
             elif self.active_provider == "groq":
-                return self._generate_groq(prompt, history, max_tokens, temperature)
+                generate = self._generate_groq
             else:
                 logger.error(f"Unknown provider: {self.active_provider}")
                 return None
+            
+            response = _call_with_retry(lambda: generate(prompt, history, max_tokens, temperature, session_id))
                 
         except Exception as e:
             logger.error(f"Error generating response with {self.active_provider}: {e}")
             return None
+        
+        if cacheable and response.content:
+            self._response_cache_put(key, namespace, embedding, response)
+        return response
     
-    def _generate_gemini(self, prompt: str, history: List[Dict[str, str]], 
-                        max_tokens: int, temperature: float) -> LLMResponse:
-        """Generate response using Google Gemini."""
-        model = genai.GenerativeModel(self.active_model)
+    def _cache_lookup(self, prompt: str, history: List[Dict[str, str]], temperature: float) -> tuple:
+        """Look a prompt up in the response cache; returns (key, namespace, embedding, response or None)."""
+        namespace = self._cache_namespace(prompt, history, temperature)
+        key = f"{namespace}:{hashlib.sha256(prompt.encode()).hexdigest()}"
+        embedding = None
+        cached = self._response_cache_get(key)
+        if cached is None:
+            embedding = self._semantic_cache.embed(prompt)
+            cached = self._semantic_cache.lookup(embedding, namespace=namespace)
+        return key, namespace, embedding, cached
+    
+    def _cache_namespace(self, prompt: str, history: List[Dict[str, str]], temperature: float) -> str:
+        """
+        Scope cache entries to the active model, temperature, exact history and
+        the prompt's identifiers (IPs, hosts, ports, CVE ids), so a semantic
+        match never answers for a different target.
+        """
+        history_hash = hashlib.sha256(json.dumps(history, sort_keys=True).encode()).hexdigest()
+        return f"{self.active_provider}:{self.active_model}:{round(temperature, 1)}:{history_hash}:{identifier_key(prompt)}"
+    
+    def _response_cache_get(self, key: str) -> Optional[LLMResponse]:
+        """Return the exact-match cached response for key, if any."""
+        with self._cache_lock:
+            response = self._response_cache.get(key)
+            if response is not None:
+                self._response_cache.move_to_end(key)
+            return response
+    
+    def _response_cache_put(self, key: str, namespace: str, embedding, response: LLMResponse):
+        """Store a response in the exact and semantic caches, and on disk if configured."""
+        # The raw SDK object is large and cannot be persisted
+        cached = LLMResponse(
+            content=response.content,
+            model=response.model,
+            provider=response.provider,
+            usage=response.usage
+        )
+        self._semantic_cache.insert(embedding, cached, namespace=namespace)
+        with self._cache_lock:
+            self._response_cache[key] = cached
+            if len(self._response_cache) > self._cache_max_entries:
+                self._response_cache.popitem(last=False)
+            
+            if self._cache_db is not None:
+                try:
+                    self._cache_db.execute(
+                        "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                        (key, namespace, embedding.tobytes() if embedding is not None else None,
+                         cached.content, cached.model, cached.provider)
+                    )
+                    self._cache_db.execute(
+                        "DELETE FROM responses WHERE rowid NOT IN "
+                        "(SELECT rowid FROM responses ORDER BY rowid DESC LIMIT ?)", (self._cache_max_entries,)
+                    )
+                    self._cache_db.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"Failed to persist cached response: {e}")
+    
+    def _open_cache_db(self, path: str) -> Optional[sqlite3.Connection]:
+        """Open the response cache database and load its most recent entries."""
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            db = sqlite3.connect(path, check_same_thread=False)
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, namespace TEXT, embedding BLOB, content TEXT, model TEXT, provider TEXT)"
+            )
+            rows = db.execute(
+                "SELECT key, namespace, embedding, content, model, provider FROM responses "
+                "ORDER BY rowid DESC LIMIT ?", (self._cache_max_entries,)
+            ).fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to open response cache {path}: {e}")
+            return None
         
-        # Convert history to Gemini format
-        chat_history = []
-        for msg in history:
-            role = "user" if msg["role"] == "user" else "model"
-            chat_history.append({"role": role, "parts": [msg["content"]]})
+        for key, namespace, embedding, content, model, provider in reversed(rows):
+            response = LLMResponse(content=content, model=model, provider=provider)
+            self._response_cache[key] = response
+            if embedding is not None and np is not None:
+                self._semantic_cache.insert(np.frombuffer(embedding, dtype=np.float32), response, namespace=namespace)
+        
+        logger.info(f"Loaded {len(rows)} cached responses from {path}")
+        return db
+    
+    def clear_cache(self):
+        """Drop all cached responses, including any persisted on disk."""
+        self._semantic_cache.clear()
+        with self._cache_lock:
+            self._response_cache.clear()
+            if self._cache_db is not None:
+                self._cache_db.execute("DELETE FROM responses")
+                self._cache_db.commit()
+    
+    async def agenerate_response(self,
+                                 prompt: str,
+                                 history: List[Dict[str, str]] = None,
+                                 max_tokens: int = 4000,
+                                 temperature: float = 0.7,
+                                 use_cache: bool = True,
+                                 session_id: str = "default") -> Optional[LLMResponse]:
+        """
+        Asynchronously generate a response using the active LLM.
+        
+        Uses each provider SDK's async client, so many requests can be in
+        flight at once; at most ASYNC_CONCURRENCY run per provider. Falls
+        back to the blocking client in a worker thread when the SDK has no
+        async client.
+        
+        Args:
+            prompt: The user's input prompt
+            history: Conversation history in format [{"role": "user/assistant", "content": "..."}]
+            max_tokens: Maximum tokens to generate
+            temperature: Sampling temperature
+            use_cache: Serve and store near-deterministic responses from the response cache
+            session_id: Conversation the history belongs to
+            
+        Returns:
+            LLMResponse object or None if failed
+        """
+        if not self.active_provider or not self.active_model:
+            logger.error("No active model set. Call set_active_model() first.")
+            return None
+            
+        if history is None:
+            history = []
+        
+        cacheable = use_cache and temperature <= CACHE_MAX_TEMPERATURE
+        if cacheable:
+            key, namespace, embedding, cached = await asyncio.to_thread(
+                self._cache_lookup, prompt, history, temperature
+            )
+            if cached is not None:
+                return cached
+        
+        provider = self.active_provider
+        try:
+            client, semaphore = self._async_client(provider)
+            if provider == "gemini":
+                agenerate = self._agenerate_gemini
+            elif client is None:
+                # No async client in the installed SDK
+                return await asyncio.to_thread(
+                    self.generate_response, prompt, history, max_tokens, temperature, use_cache, session_id
+                )
+            elif provider == "mistral":
+                agenerate = self._agenerate_mistral
+            elif provider == "groq":
+                agenerate = self._agenerate_groq
+            else:
+                logger.error(f"Unknown provider: {provider}")
+                return None
+            
+            async with semaphore:
+                response = await _acall_with_retry(
+                    lambda: agenerate(prompt, history, max_tokens, temperature, session_id)
+                )
+                    
+        except Exception as e:
+            logger.error(f"Error generating response with {provider}: {e}")
+            return None
+        
+        if cacheable and response.content:
+            self._response_cache_put(key, namespace, embedding, response)
+        return response
+    
+    async def agenerate_batch(self, prompts: List[str], **kwargs) -> List[Optional[LLMResponse]]:
+        """
+        Generate responses for several independent prompts concurrently.
+        
+        Args:
+            prompts: Prompts to send
+            **kwargs: Passed to agenerate_response for every prompt
+            
+        Returns:
+            One LLMResponse (or None if that request failed) per prompt, in order
+        """
+        return await asyncio.gather(*[self.agenerate_response(prompt, **kwargs) for prompt in prompts])
+    
+    def _async_client(self, provider: str) -> tuple:
+        """Get (async client or None, semaphore) for a provider on the running loop."""
+        state = self._async_state.setdefault(asyncio.get_running_loop(), {})
+        if provider not in state:
+            api_key = self._api_keys.get(provider)
+            if provider == "mistral" and MistralAsyncClient:
+                client = MistralAsyncClient(api_key=api_key)
+            elif provider == "groq" and AsyncGroq:
+                client = AsyncGroq(api_key=api_key, http_client=_pooled_http_client(async_client=True))
+            else:
+                # Gemini's async calls go through the module-level configuration
+                client = None
+            state[provider] = (client, asyncio.Semaphore(ASYNC_CONCURRENCY))
+        return state[provider]
+    
+    def stream_response(self,
+                        prompt: str,
+                        history: List[Dict[str, str]] = None,
+                        max_tokens: int = 4000,
+                        temperature: float = 0.7,
+                        session_id: str = "default") -> Iterator[str]:
+        """
+        Stream a response from the active LLM as text chunks.
         
-        # Start chat with history
-        chat = model.start_chat(history=chat_history)
+        Args:
+            prompt: The user's input prompt
+            history: Conversation history in format [{"role": "user/assistant", "content": "..."}]
+            max_tokens: Maximum tokens to generate
+            temperature: Sampling temperature
+            session_id: Conversation the history belongs to
+            
+        Yields:
+            Text deltas in the order they are produced. Nothing is yielded
+            if the request fails before the first delta; the error is logged.
+            
+        Raises:
+            Exception: The provider error, if the stream fails after text has
+                been yielded, so a truncated reply is never taken as complete
+        """
+        if not self.active_provider or not self.active_model:
+            logger.error("No active model set. Call set_active_model() first.")
+            return
+            
+        if history is None:
+            history = []
+        
+        started = False
+        try:
+            if self.active_provider == "gemini":
+                stream = self._stream_gemini
+            elif self.active_provider == "mistral":
+                stream = self._stream_mistral
+            elif self.active_provider == "groq":
+                stream = self._stream_groq
+            else:
+                logger.error(f"Unknown provider: {self.active_provider}")
+                return
+            
+            for chunk in _stream_with_retry(lambda: stream(prompt, history, max_tokens, temperature, session_id)):
+                started = True
+                yield chunk
+                
+        except Exception as e:
+            logger.error(f"Error streaming response with {self.active_provider}: {e}")
+            if started:
+                raise
+    
+    def _generate_gemini(self, prompt: str, history: List[Dict[str, str]], 
+                        max_tokens: int, temperature: float, session_id: str) -> LLMResponse:
+        """Generate response using Google Gemini."""
+        key = (self.active_model, session_id)
+        chat, synced = self._gemini_chat(key, history)
         
         # Generate response
         response = chat.send_message(
@@ -204,7 +671,27 @@ class LLMManager:
                 temperature=temperature
             )
         )
+        self._keep_gemini_chat(key, chat, synced, prompt, response.text)
+        return self._gemini_response(response)
+    
+    async def _agenerate_gemini(self, prompt: str, history: List[Dict[str, str]],
+                                max_tokens: int, temperature: float, session_id: str) -> LLMResponse:
+        """Generate response using Google Gemini's async API."""
+        key = (self.active_model, session_id)
+        chat, synced = self._gemini_chat(key, history)
         
+        response = await chat.send_message_async(
+            prompt,
+            generation_config=genai.types.GenerationConfig(
+                max_output_tokens=max_tokens,
+                temperature=temperature
+            )
+        )
+        self._keep_gemini_chat(key, chat, synced, prompt, response.text)
+        return self._gemini_response(response)
+    
+    def _gemini_response(self, response) -> LLMResponse:
+        """Convert a Gemini response to an LLMResponse."""
         return LLMResponse(
             content=response.text,
             model=self.active_model,
@@ -214,18 +701,113 @@ class LLMManager:
             raw_response=response
         )
     
-    def _generate_mistral(self, prompt: str, history: List[Dict[str, str]], 
-                         max_tokens: int, temperature: float) -> LLMResponse:
-        """Generate response using Mistral AI."""
-        client = self.clients["mistral"]
+    def _stream_gemini(self, prompt: str, history: List[Dict[str, str]],
+                       max_tokens: int, temperature: float, session_id: str) -> Iterator[str]:
+        """Stream response using Google Gemini."""
+        key = (self.active_model, session_id)
+        chat, synced = self._gemini_chat(key, history)
+        
+        response = chat.send_message(
+            prompt,
+            generation_config=genai.types.GenerationConfig(
+                max_output_tokens=max_tokens,
+                temperature=temperature
+            ),
+            stream=True
+        )
+        parts = []
+        for chunk in response:
+            if chunk.text:
+                parts.append(chunk.text)
+                yield chunk.text
         
-        # Convert history to Mistral format
-        messages = []
+        # The session only records the turn once the stream is fully consumed
+        self._keep_gemini_chat(key, chat, synced, prompt, "".join(parts))
+    
+    def _gemini_chat(self, key: tuple, history: List[Dict[str, str]]) -> tuple:
+        """
+        Get a Gemini chat session holding the conversation history.
+        
+        Reuses the session from the previous turn when this history is what
+        it holds, or the tail of it once a rolling window has dropped the
+        oldest messages, so only the new prompt is converted and sent;
+        otherwise starts a new one. Returns (session, synced history); the
+        session is checked out until _keep_gemini_chat() hands it back, so
+        concurrent calls never share one.
+        """
+        entry = self._gemini_chats.pop(key, None)
+        if entry is not None:
+            chat, synced = entry
+            dropped = self._dropped_prefix(synced, history)
+            if dropped is not None:
+                del chat.history[:dropped]
+                del synced[:dropped]
+                return chat, synced
+        
+        model_name = key[0]
+        model = self._gemini_models.get(model_name)
+        if model is None:
+            model = self._gemini_models[model_name] = genai.GenerativeModel(model_name)
+        
+        # Convert history to Gemini format
+        chat_history = []
         for msg in history:
-            messages.append(ChatMessage(role=msg["role"], content=msg["content"]))
+            role = "user" if msg["role"] == "user" else "model"
+            chat_history.append({"role": role, "parts": [msg["content"]]})
         
-        # Add current prompt
-        messages.append(ChatMessage(role="user", content=prompt))
+        synced = [(msg["role"], msg["content"]) for msg in history]
+        return model.start_chat(history=chat_history), synced
+    
+    def _keep_gemini_chat(self, key: tuple, chat, synced: List[tuple], prompt: str, reply: str):
+        """Return a session after a completed turn so the next turn can reuse it."""
+        synced.append(("user", prompt))
+        synced.append(("assistant", reply))
+        self._keep_session(self._gemini_chats, key, (chat, synced))
+    
+    @staticmethod
+    def _dropped_prefix(synced: List[tuple], history: List[Dict[str, str]]) -> Optional[int]:
+        """
+        How many of a session's oldest synced messages history no longer holds.
+        
+        Returns 0 when history matches the synced history exactly, n when it
+        matches all but the first n synced messages (a rolling context
+        window that slid), and None when it is not a tail of it.
+        """
+        dropped = len(synced) - len(history)
+        if dropped < 0:
+            return None
+        for i, msg in enumerate(history):
+            if synced[dropped + i] != (msg["role"], msg["content"]):
+                return None
+        return dropped
+    
+    @staticmethod
+    def _keep_session(sessions: Dict[tuple, tuple], key: tuple, entry: tuple):
+        """Store a session's state as the most recently used, dropping the oldest beyond MAX_CHAT_SESSIONS."""
+        sessions[key] = entry
+        if len(sessions) > MAX_CHAT_SESSIONS:
+            sessions.pop(next(iter(sessions)))
+    
+    def reset_chat(self, model: str = None):
+        """
+        Drop the cached Gemini chat sessions and converted Mistral/Groq histories.
+        
+        Args:
+            model: Gemini model whose sessions to drop (optional, drops everything if not provided)
+        """
+        if model is None:
+            self._gemini_chats.clear()
+            self._converted_history.clear()
+        else:
+            for key in [key for key in self._gemini_chats if key[0] == model]:
+                self._gemini_chats.pop(key, None)
+    
+    def _generate_mistral(self, prompt: str, history: List[Dict[str, str]], 
+                         max_tokens: int, temperature: float, session_id: str) -> LLMResponse:
+        """Generate response using Mistral AI."""
+        client = self.clients["mistral"]
+        key = ("mistral", session_id)
+        messages, synced = self._session_messages(key, prompt, history)
         
         # Generate response
         response = client.chat(
@@ -234,28 +816,54 @@ class LLMManager:
             max_tokens=max_tokens,
             temperature=temperature
         )
+        result = self._chat_completion_response(response, "mistral")
+        self._keep_session_messages(key, messages, synced, prompt, result.content)
+        return result
+    
+    async def _agenerate_mistral(self, prompt: str, history: List[Dict[str, str]],
+                                 max_tokens: int, temperature: float, session_id: str) -> LLMResponse:
+        """Generate response using Mistral AI's async client."""
+        client, _ = self._async_client("mistral")
+        key = ("mistral", session_id)
+        messages, synced = self._session_messages(key, prompt, history)
         
-        return LLMResponse(
-            content=response.choices[0].message.content,
+        response = await client.chat(
             model=self.active_model,
-            provider="mistral",
-            usage={"prompt_tokens": response.usage.prompt_tokens if hasattr(response, 'usage') else None,
-                   "completion_tokens": response.usage.completion_tokens if hasattr(response, 'usage') else None},
-            raw_response=response
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature
         )
+        result = self._chat_completion_response(response, "mistral")
+        self._keep_session_messages(key, messages, synced, prompt, result.content)
+        return result
+    
+    def _stream_mistral(self, prompt: str, history: List[Dict[str, str]],
+                        max_tokens: int, temperature: float, session_id: str) -> Iterator[str]:
+        """Stream response using Mistral AI."""
+        client = self.clients["mistral"]
+        key = ("mistral", session_id)
+        messages, synced = self._session_messages(key, prompt, history)
+        
+        parts = []
+        for chunk in client.chat_stream(
+            model=self.active_model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature
+        ):
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                yield delta
+        
+        self._keep_session_messages(key, messages, synced, prompt, "".join(parts))
     
     def _generate_groq(self, prompt: str, history: List[Dict[str, str]], 
-                      max_tokens: int, temperature: float) -> LLMResponse:
+                      max_tokens: int, temperature: float, session_id: str) -> LLMResponse:
         """Generate response using Groq."""
         client = self.clients["groq"]
-        
-        # Convert history to OpenAI format (Groq uses OpenAI-compatible API)
-        messages = []
-        for msg in history:
-            messages.append({"role": msg["role"], "content": msg["content"]})
-        
-        # Add current prompt
-        messages.append({"role": "user", "content": prompt})
+        key = ("groq", session_id)
+        messages, synced = self._session_messages(key, prompt, history)
         
         # Generate response
         response = client.chat.completions.create(
@@ -264,11 +872,95 @@ class LLMManager:
             max_tokens=max_tokens,
             temperature=temperature
         )
+        result = self._chat_completion_response(response, "groq")
+        self._keep_session_messages(key, messages, synced, prompt, result.content)
+        return result
+    
+    async def _agenerate_groq(self, prompt: str, history: List[Dict[str, str]],
+                              max_tokens: int, temperature: float, session_id: str) -> LLMResponse:
+        """Generate response using Groq's async client."""
+        client, _ = self._async_client("groq")
+        key = ("groq", session_id)
+        messages, synced = self._session_messages(key, prompt, history)
+        
+        response = await client.chat.completions.create(
+            model=self.active_model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature
+        )
+        result = self._chat_completion_response(response, "groq")
+        self._keep_session_messages(key, messages, synced, prompt, result.content)
+        return result
+    
+    def _stream_groq(self, prompt: str, history: List[Dict[str, str]],
+                     max_tokens: int, temperature: float, session_id: str) -> Iterator[str]:
+        """Stream response using Groq."""
+        client = self.clients["groq"]
+        key = ("groq", session_id)
+        messages, synced = self._session_messages(key, prompt, history)
+        
+        parts = []
+        for chunk in client.chat.completions.create(
+            model=self.active_model,
+            messages=messages,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            stream=True
+        ):
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                yield delta
+        
+        self._keep_session_messages(key, messages, synced, prompt, "".join(parts))
+    
+    def _session_messages(self, key: tuple, prompt: str, history: List[Dict[str, str]]) -> tuple:
+        """
+        Get the Mistral/Groq messages for the history plus the current prompt.
         
+        Reuses the list converted on the previous turn of the session when
+        this history is what it holds, or the tail of it once a rolling window
+        has dropped the oldest messages, so only the new prompt is converted;
+        otherwise converts the whole history. Returns (messages, synced
+        history); like Gemini sessions, the list is checked out until
+        _keep_session_messages() hands it back.
+        """
+        entry = self._converted_history.pop(key, None)
+        dropped = None if entry is None else self._dropped_prefix(entry[1], history)
+        if dropped is not None:
+            messages, synced = entry
+            del messages[:dropped]
+            del synced[:dropped]
+        else:
+            messages = [self._chat_message(key[0], msg["role"], msg["content"]) for msg in history]
+            synced = [(msg["role"], msg["content"]) for msg in history]
+        
+        # Add current prompt
+        messages.append(self._chat_message(key[0], "user", prompt))
+        return messages, synced
+    
+    def _keep_session_messages(self, key: tuple, messages: List[Any], synced: List[tuple],
+                               prompt: str, reply: str):
+        """Return converted messages after a completed turn so the next turn can extend them."""
+        messages.append(self._chat_message(key[0], "assistant", reply))
+        synced.append(("user", prompt))
+        synced.append(("assistant", reply))
+        self._keep_session(self._converted_history, key, (messages, synced))
+    
+    @staticmethod
+    def _chat_message(provider: str, role: str, content: str) -> Any:
+        """Build one chat message: a ChatMessage for Mistral, an OpenAI-format dict for Groq."""
+        if provider == "mistral":
+            return ChatMessage(role=role, content=content)
+        return {"role": role, "content": content}
+    
+    def _chat_completion_response(self, response, provider: str) -> LLMResponse:
+        """Convert a Mistral/Groq chat completion to an LLMResponse."""
         return LLMResponse(
             content=response.choices[0].message.content,
             model=self.active_model,
-            provider="groq",
+            provider=provider,
             usage={"prompt_tokens": response.usage.prompt_tokens if hasattr(response, 'usage') else None,
                    "completion_tokens": response.usage.completion_tokens if hasattr(response, 'usage') else None},
             raw_response=response
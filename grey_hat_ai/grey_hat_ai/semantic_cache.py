@@ -0,0 +1,187 @@
+"""
+Semantic Cache for Grey Hat AI
+
+This module provides a small in-process cache keyed by text embeddings:
+- the shared sentence-transformers encoder from grey_hat_ai.embeddings
+- FAISS inner-product index for cosine similarity lookups
+- NumPy fallback when FAISS is not installed
+
+Near-duplicate prompts return the stored value instead of paying for
+another provider round-trip.
+"""
+
+import logging
+import re
+import threading
+from typing import Any, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+from grey_hat_ai import embeddings
+
+logger = logging.getLogger(__name__)
+
+# Tokens naming one specific thing, which embeddings barely tell apart: anything
+# with a digit (IPs, ports, CVE ids, versions), paths/URLs and dotted host names
+_IDENTIFIER_PATTERN = re.compile(r"\S*[\d/]\S*|\S+\.\w\S*")
+
+
+def identifier_key(text: str) -> str:
+    """
+    Extract the identifiers in text, in order.
+
+    Two texts that embed as near-duplicates but differ here (e.g. "scan
+    10.0.0.1" vs "scan 10.0.0.2") are about different targets; add the key
+    to the namespace so such entries can never match each other.
+
+    Args:
+        text: Text being cached
+
+    Returns:
+        Space-separated, lowercased identifier tokens ("" if there are none)
+    """
+    return " ".join(
+        token.strip(".,;:!?()[]{}\"'").lower() for token in _IDENTIFIER_PATTERN.findall(text)
+    )
+
+
+class SemanticCache:
+    """
+    Embedding-similarity cache.
+
+    Entries are stored as normalized embeddings so cosine similarity is a
+    plain inner product. Each entry carries a namespace (e.g. the active
+    provider:model) so hits never cross between unrelated callers. Once
+    full, the least recently used entry is evicted.
+    """
+
+    def __init__(self,
+                 threshold: float = 0.95,
+                 max_entries: int = 1000,
+                 model_name: str = embeddings.DEFAULT_MODEL):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.model_name = model_name
+        self._index = None
+        self._matrix = None
+        self._entries: List[Tuple[str, Any]] = []
+        self._last_used: List[int] = []  # per entry, tick of its last insert/hit
+        self._tick = 0
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        """Whether the embedding backend is installed and its model loadable."""
+        return embeddings.available(self.model_name)
+
+    def embed(self, text: str) -> Optional[Any]:
+        """
+        Embed text for lookup/insert.
+
+        Args:
+            text: Text to embed
+
+        Returns:
+            Normalized float32 vector, or None if embeddings are unavailable
+        """
+        if not self.available:
+            return None
+
+        try:
+            vectors = embeddings.embed_batch([text], self.model_name)
+            return None if vectors is None else vectors[0]
+        except Exception as e:
+            logger.error(f"Embedding error: {e}")
+            return None
+
+    def lookup(self, embedding, namespace: str = "") -> Optional[Any]:
+        """
+        Find a cached value similar to the given embedding.
+
+        Args:
+            embedding: Vector returned by embed()
+            namespace: Only entries stored under this namespace can match
+
+        Returns:
+            The cached value, or None on a miss
+        """
+        if embedding is None:
+            return None
+
+        with self._lock:
+            if not self._entries:
+                return None
+
+            # Rank every entry: the closest ones are often the same question in other
+            # namespaces (e.g. about other targets) and must not crowd out a match here
+            for score, idx in self._search(embedding, k=len(self._entries)):
+                if score < self.threshold:
+                    break
+                entry_namespace, value = self._entries[idx]
+                if entry_namespace == namespace:
+                    self._tick += 1
+                    self._last_used[idx] = self._tick
+                    return value
+        return None
+
+    def insert(self, embedding, value: Any, namespace: str = ""):
+        """
+        Store a value under the given embedding.
+
+        Args:
+            embedding: Vector returned by embed()
+            value: Value to cache
+            namespace: Namespace the entry belongs to
+        """
+        if embedding is None:
+            return
+
+        with self._lock:
+            # Evict the least recently used entry once full
+            if len(self._entries) >= self.max_entries:
+                idx = min(range(len(self._last_used)), key=self._last_used.__getitem__)
+                self._entries.pop(idx)
+                self._last_used.pop(idx)
+                if self._index is not None:
+                    # IndexFlat renumbers the remaining ids, keeping them aligned with _entries
+                    self._index.remove_ids(np.array([idx], dtype=np.int64))
+                else:
+                    self._matrix = np.delete(self._matrix, idx, axis=0)
+
+            vector = embedding.reshape(1, -1)
+            if faiss is not None:
+                if self._index is None:
+                    self._index = faiss.IndexFlatIP(vector.shape[1])
+                self._index.add(vector)
+            else:
+                self._matrix = vector if self._matrix is None else np.vstack([self._matrix, vector])
+            self._entries.append((namespace, value))
+            self._tick += 1
+            self._last_used.append(self._tick)
+
+    def clear(self):
+        """Drop all cached entries."""
+        with self._lock:
+            self._entries = []
+            self._last_used = []
+            self._index = None
+            self._matrix = None
+
+    def _search(self, embedding, k: int) -> List[Tuple[float, int]]:
+        """Return the top-k (score, index) pairs, best first."""
+        vector = embedding.reshape(1, -1)
+        if self._index is not None:
+            scores, ids = self._index.search(vector, k)
+            return [(float(s), int(i)) for s, i in zip(scores[0], ids[0]) if i >= 0]
+
+        scores = self._matrix @ vector[0]
+        top = np.argsort(-scores)[:k]
+        return [(float(scores[i]), int(i)) for i in top]
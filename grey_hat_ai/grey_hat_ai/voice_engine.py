@@ -9,14 +9,19 @@ This module provides speech-to-text and text-to-speech capabilities using:
 
 import os
 import io
+import contextlib
+import re
+import hashlib
 import logging
 import threading
 import queue
+import tempfile
 import time
 import wave
-from typing import Optional, Callable, Dict, Any
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, Callable, Dict, Any, Iterable, Iterator, List
 from dataclasses import dataclass
-import tempfile
 
 try:
     import sounddevice as sd
@@ -26,15 +31,44 @@ except ImportError:
     np = None
 
 try:
-    from faster_whisper import WhisperModel
+    from faster_whisper import WhisperModel, decode_audio
 except ImportError:
     WhisperModel = None
+    decode_audio = None
+
+try:
+    from faster_whisper import BatchedInferencePipeline
+except ImportError:
+    # Added in faster-whisper 1.1
+    BatchedInferencePipeline = None
+
+try:
+    import miniaudio  # in-memory / streaming MP3 decoding
+except ImportError:
+    miniaudio = None
+
+try:
+    import ctranslate2  # faster-whisper's inference backend
+except ImportError:
+    ctranslate2 = None
 
 try:
     import webrtcvad
 except ImportError:
     webrtcvad = None
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+try:
+    from blake3 import blake3 as _text_hash
+except ImportError:
+    _text_hash = hashlib.blake2b
+
+from grey_hat_ai.semantic_cache import SemanticCache, identifier_key
+
 try:
     from elevenlabs import generate, set_api_key, voices, Voice
     from elevenlabs.api import History
@@ -47,25 +81,93 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Preallocated capture slots between the audio callback and the recording loop
+CAPTURE_SLOTS = 8
+
+# Eleven Labs MP3 is decoded to mono int16 at this rate for playback
+PLAYBACK_SAMPLE_RATE = 44100
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _f32_to_i16(src, dst):
+        """Scale float32 samples in [-1, 1] into a preallocated int16 buffer."""
+        for i in range(src.shape[0]):
+            dst[i] = np.int16(src[i] * 32767)
+else:
+    _f32_to_i16 = None
+
+
+if miniaudio is not None:
+    class _ChunkSource(miniaudio.StreamableSource):
+        """Feed an iterator of MP3 byte chunks to miniaudio, keeping a copy of everything read."""
+        
+        def __init__(self, chunks: Iterable[bytes]):
+            self._chunks = iter(chunks)
+            self._pending = b""
+            self.data = bytearray()
+        
+        def read(self, num_bytes: int) -> bytes:
+            while len(self._pending) < num_bytes:
+                chunk = next(self._chunks, None)
+                if chunk is None:
+                    break
+                self.data.extend(chunk)
+                self._pending += chunk
+            out, self._pending = self._pending[:num_bytes], self._pending[num_bytes:]
+            return out
+
+
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def iter_sentences(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Regroup streamed text chunks into sentences.
+    
+    A sentence is yielded as soon as the text following its closing
+    punctuation (. ! ?) starts, so speech can begin before the stream ends.
+    """
+    buffer = ""
+    for chunk in chunks:
+        buffer += chunk
+        *sentences, buffer = _SENTENCE_END_RE.split(buffer)
+        for sentence in sentences:
+            if sentence.strip():
+                yield sentence.strip()
+    if buffer.strip():
+        yield buffer.strip()
+
 
 @dataclass
 class VoiceConfig:
     """Configuration for voice engine."""
     # STT Configuration
     whisper_model_size: str = "base"  # tiny, base, small, medium, large
+    # Approximate model memory at float16 / int8: tiny ~0.1/0.05 GB, base ~0.2/0.1 GB,
+    # small ~0.5/0.3 GB, medium ~1.5/0.8 GB, large ~3/1.6 GB
+    whisper_device: Optional[str] = None  # "cuda" or "cpu"; None = CUDA when available
+    whisper_compute_type: Optional[str] = None  # None = int8_float16 on CUDA, int8 on CPU
     sample_rate: int = 16000
     chunk_duration: float = 0.5  # seconds
     vad_aggressiveness: int = 2  # 0-3, higher = more aggressive
+    vad_min_speech_frames: int = 1  # 30ms frames per chunk that must be speech
     silence_threshold: float = 2.0  # seconds of silence before stopping
+    max_utterance_duration: float = 30.0  # seconds; longer speech is transcribed in pieces
     
     # TTS Configuration
     elevenlabs_voice_id: str = "21m00Tcm4TlvDq8ikWAM"  # Default voice (Rachel)
     elevenlabs_stability: float = 0.75
     elevenlabs_clarity: float = 0.75
     elevenlabs_style: float = 0.0
+    tts_semantic_threshold: float = 0.95  # cosine similarity for reusing audio of near-identical text
+    tts_max_concurrency: int = 3  # sentences synthesized in parallel (Eleven Labs rate limits)
+    tts_memory_cache_mb: int = 32  # least recently used clips are dropped beyond this
+    tts_cache_dir: Optional[str] = "~/.cache/greyhatai/tts"  # None disables the on-disk cache
+    tts_cache_max_mb: int = 200  # oldest clips are removed beyond this
     
     # Audio settings
-    audio_device: Optional[int] = None  # None = default device
+    audio_device: Optional[int] = None  # input (microphone) device; None = default device
+    output_device: Optional[int] = None  # playback device; None = default device
 
 
 class VoiceEngine:
@@ -81,37 +183,55 @@ class VoiceEngine:
     
     def __init__(self, config: VoiceConfig = None):
         self.config = config or VoiceConfig()
-        self.whisper_model = None
+        self._whisper_future: Optional[Future] = None  # resolves to the model, or None on failure
         self.vad = None
         self.elevenlabs_configured = False
         
         # Audio recording state
         self.is_listening = False
-        self.audio_queue = queue.Queue()
         self.recording_thread = None
         
+        # Utterances are transcribed here so capture and VAD never wait on Whisper
+        # (CTranslate2 releases the GIL while decoding)
+        self._transcribe_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="whisper")
+        
         # Callbacks
         self.on_speech_detected: Optional[Callable[[str], None]] = None
         self.on_listening_start: Optional[Callable[[], None]] = None
         self.on_listening_stop: Optional[Callable[[], None]] = None
         
-        # Audio cache for TTS
-        self.tts_cache: Dict[str, bytes] = {}
+        # Audio cache for TTS: exact text first, then near-identical text
+        # Keyed by (voice_id, stability, clarity, style, text), in LRU order, oldest first
+        self.tts_cache: "OrderedDict[tuple, bytes]" = OrderedDict()
+        self._tts_cache_bytes = 0
+        self._tts_cache_lock = threading.Lock()
+        
+        # Running size of the disk cache, None until the first write scans it
+        self._tts_disk_bytes: Optional[int] = None
+        self._tts_disk_lock = threading.Lock()
+        
+        # Synthesizes upcoming sentences while earlier ones play
+        self._tts_executor = ThreadPoolExecutor(
+            max_workers=self.config.tts_max_concurrency, thread_name_prefix="tts-synth"
+        )
+        
+        # Opened on first playback and kept open; the lock keeps clips from interleaving
+        self._output_stream = None
+        self._playback_lock = threading.Lock()
+        self._semantic_tts_cache = SemanticCache(
+            threshold=self.config.tts_semantic_threshold,
+            max_entries=50
+        )
         
         self._initialize_components()
     
     def _initialize_components(self):
         """Initialize STT and VAD components."""
         try:
-            # Initialize Whisper model
+            # Load Whisper on the transcription worker so construction returns
+            # immediately; transcriptions queue behind the load
             if WhisperModel:
-                logger.info(f"Loading Whisper model: {self.config.whisper_model_size}")
-                self.whisper_model = WhisperModel(
-                    self.config.whisper_model_size,
-                    device="cpu",  # Use CPU for compatibility
-                    compute_type="int8"  # Optimize for speed
-                )
-                logger.info("Whisper model loaded successfully")
+                self._whisper_future = self._transcribe_executor.submit(self._load_whisper_model)
             else:
                 logger.warning("faster-whisper not available, STT disabled")
             
@@ -121,10 +241,56 @@ class VoiceEngine:
                 logger.info("Voice Activity Detection initialized")
             else:
                 logger.warning("webrtcvad not available, VAD disabled")
+            
+            # Compile the int16 kernel now so the recording thread never waits on the JIT
+            if _f32_to_i16 is not None and np is not None:
+                _f32_to_i16(np.zeros(1, dtype=np.float32), np.empty(1, dtype=np.int16))
                 
         except Exception as e:
             logger.error(f"Error initializing voice components: {e}")
     
+    @property
+    def whisper_model(self):
+        """The Whisper model, waiting for the background load if it is still running."""
+        if self._whisper_future is None:
+            return None
+        return self._whisper_future.result()
+    
+    def _load_whisper_model(self):
+        """Load the Whisper model; runs on the transcription worker."""
+        try:
+            logger.info(f"Loading Whisper model: {self.config.whisper_model_size}")
+            device, compute_type = self._whisper_device()
+            model = WhisperModel(
+                self.config.whisper_model_size,
+                device=device,
+                compute_type=compute_type,
+                cpu_threads=max(1, (os.cpu_count() or 2) // 2),
+                num_workers=2
+            )
+            logger.info(f"Whisper model loaded successfully ({device}, {compute_type})")
+            return model
+        except Exception as e:
+            logger.error(f"Error loading Whisper model: {e}")
+            return None
+    
+    def _whisper_device(self) -> tuple:
+        """Pick (device, compute_type) for Whisper, honouring the config overrides."""
+        device = self.config.whisper_device
+        if device is None:
+            # No MPS backend in faster-whisper, so Apple Silicon stays on CPU
+            try:
+                has_cuda = ctranslate2 is not None and ctranslate2.get_cuda_device_count() > 0
+            except Exception:
+                has_cuda = False
+            device = "cuda" if has_cuda else "cpu"
+        
+        compute_type = self.config.whisper_compute_type
+        if compute_type is None:
+            # int8 weights with float16 compute: about half the VRAM of float16
+            compute_type = "int8_float16" if device == "cuda" else "int8"
+        return device, compute_type
+    
     def set_elevenlabs_api_key(self, api_key: str) -> bool:
         """
         Configure Eleven Labs API for TTS.
@@ -214,14 +380,39 @@ class VoiceEngine:
     def _recording_loop(self):
         """Main recording loop running in separate thread."""
         chunk_size = int(self.config.sample_rate * self.config.chunk_duration)
-        audio_buffer = []
+        # Utterance samples accumulate in one preallocated buffer; length marks the end
+        utterance = np.empty(
+            max(int(self.config.sample_rate * self.config.max_utterance_duration), chunk_size),
+            dtype=np.float32
+        )
+        length = 0
         silence_chunks = 0
         max_silence_chunks = int(self.config.silence_threshold / self.config.chunk_duration)
         
+        # Reused for every chunk's int16 conversion
+        chunk_int16 = np.empty(chunk_size, dtype=np.int16)
+        scratch = np.empty(chunk_size, dtype=np.float32)
+        
+        # Single-producer/single-consumer ring: the callback copies into slot
+        # head % CAPTURE_SLOTS and only advances head, the loop only advances tail
+        slots = np.empty((CAPTURE_SLOTS, chunk_size), dtype=np.float32)
+        slot_frames = [0] * CAPTURE_SLOTS
+        ready = threading.Semaphore(0)
+        head = 0
+        tail = 0
+        
         def audio_callback(indata, frames, time, status):
+            nonlocal head
             if status:
                 logger.warning(f"Audio callback status: {status}")
-            self.audio_queue.put(indata.copy())
+            if head - tail >= CAPTURE_SLOTS:
+                # Consumer is a full ring behind; drop this block rather than block the audio thread
+                return
+            slot = head % CAPTURE_SLOTS
+            np.copyto(slots[slot, :frames], indata[:, 0])
+            slot_frames[slot] = frames
+            head += 1
+            ready.release()
         
         try:
             with sd.InputStream(
@@ -233,35 +424,50 @@ class VoiceEngine:
                 callback=audio_callback
             ):
                 while self.is_listening:
+                    if not ready.acquire(timeout=0.1):
+                        continue
                     try:
-                        # Get audio chunk
-                        chunk = self.audio_queue.get(timeout=0.1)
+                        # Get audio chunk; the slot is not reused until tail advances
+                        slot = tail % CAPTURE_SLOTS
+                        n = slot_frames[slot]
+                        samples = slots[slot, :n]
                         
                         # Convert to int16 for VAD
-                        chunk_int16 = (chunk * 32767).astype(np.int16)
+                        if _f32_to_i16 is not None:
+                            _f32_to_i16(samples, chunk_int16[:n])
+                        else:
+                            np.multiply(samples, 32767, out=scratch[:n])
+                            chunk_int16[:n] = scratch[:n]
                         
                         # Check for voice activity
-                        is_speech = self._is_speech(chunk_int16.tobytes())
+                        is_speech = self._is_speech(chunk_int16[:n].tobytes())
                         
                         if is_speech:
-                            audio_buffer.append(chunk)
                             silence_chunks = 0
                         else:
                             silence_chunks += 1
-                            if audio_buffer:  # Only add silence if we have speech
-                                audio_buffer.append(chunk)
+                        
+                        # Only keep silence once we have speech
+                        if is_speech or length:
+                            if length + n > utterance.shape[0]:
+                                # Buffer full; transcribe what we have and keep going
+                                self._transcribe_executor.submit(self._process_audio_buffer, utterance[:length].copy())
+                                length = 0
+                            utterance[length:length + n] = samples
+                            length += n
                         
                         # Process accumulated audio if we have enough silence
-                        if audio_buffer and silence_chunks >= max_silence_chunks:
-                            self._process_audio_buffer(audio_buffer)
-                            audio_buffer = []
+                        if length and silence_chunks >= max_silence_chunks:
+                            # Copied once: the buffer is refilled while the worker transcribes
+                            self._transcribe_executor.submit(self._process_audio_buffer, utterance[:length].copy())
+                            length = 0
                             silence_chunks = 0
                             
-                    except queue.Empty:
-                        continue
                     except Exception as e:
                         logger.error(f"Error in recording loop: {e}")
                         break
+                    finally:
+                        tail += 1
                         
         except Exception as e:
             logger.error(f"Error starting audio stream: {e}")
@@ -276,26 +482,29 @@ class VoiceEngine:
             frame_duration = 30  # ms
             frame_size = int(self.config.sample_rate * frame_duration / 1000)
             
-            if len(audio_bytes) < frame_size * 2:  # 2 bytes per sample (int16)
+            frame_bytes = frame_size * 2  # 2 bytes per sample (int16)
+            if len(audio_bytes) < frame_bytes:
                 return False
-                
-            # Take first complete frame
-            frame = audio_bytes[:frame_size * 2]
-            return self.vad.is_speech(frame, self.config.sample_rate)
+            
+            # Check every complete frame, stopping once enough are speech
+            speech_frames = 0
+            for start in range(0, len(audio_bytes) - frame_bytes + 1, frame_bytes):
+                if self.vad.is_speech(audio_bytes[start:start + frame_bytes], self.config.sample_rate):
+                    speech_frames += 1
+                    if speech_frames >= self.config.vad_min_speech_frames:
+                        return True
+            return False
             
         except Exception as e:
             logger.error(f"VAD error: {e}")
             return True  # Assume speech on error
     
-    def _process_audio_buffer(self, audio_buffer):
-        """Process accumulated audio buffer for speech recognition."""
-        if not audio_buffer:
+    def _process_audio_buffer(self, audio_data):
+        """Process an utterance's float32 samples for speech recognition."""
+        if not len(audio_data):
             return
             
         try:
-            # Concatenate audio chunks
-            audio_data = np.concatenate(audio_buffer)
-            
             # Transcribe using Whisper
             text = self._transcribe_audio(audio_data)
             
@@ -315,13 +524,17 @@ class VoiceEngine:
             if audio_data.dtype != np.float32:
                 audio_data = audio_data.astype(np.float32)
             
-            # Transcribe
+            # Transcribe greedily; the recording loop has already trimmed the
+            # utterance with webrtcvad, so Whisper's own VAD pass is skipped
             segments, info = self.whisper_model.transcribe(
                 audio_data,
                 language="en",  # Can be made configurable
                 task="transcribe",
-                vad_filter=True,
-                vad_parameters=dict(min_silence_duration_ms=500)
+                beam_size=1,
+                best_of=1,
+                without_timestamps=True,
+                condition_on_previous_text=False,
+                vad_filter=False
             )
             
             # Combine all segments
@@ -332,12 +545,14 @@ class VoiceEngine:
             logger.error(f"Transcription error: {e}")
             return ""
     
-    def transcribe_file(self, audio_file_path: str) -> str:
+    def transcribe_file(self, audio_file_path: str, vad_filter: bool = True) -> str:
         """
         Transcribe an audio file.
         
         Args:
             audio_file_path: Path to audio file
+            vad_filter: Skip non-speech with Whisper's VAD (files are not
+                gated by webrtcvad like live recordings are)
             
         Returns:
             Transcribed text
@@ -350,7 +565,9 @@ class VoiceEngine:
             segments, info = self.whisper_model.transcribe(
                 audio_file_path,
                 language="en",
-                task="transcribe"
+                task="transcribe",
+                vad_filter=vad_filter,
+                vad_parameters=dict(min_silence_duration_ms=500)
             )
             
             text = " ".join([segment.text for segment in segments])
@@ -360,6 +577,58 @@ class VoiceEngine:
             logger.error(f"File transcription error: {e}")
             return ""
     
+    def transcribe_files(self, audio_file_paths: List[str], batch_size: int = 8) -> List[str]:
+        """
+        Transcribe several audio files.
+        
+        Files are decoded concurrently, then each is transcribed with
+        faster-whisper's BatchedInferencePipeline, which decodes batch_size
+        segments at a time. Falls back to transcribe_file() per file on
+        faster-whisper releases without the batched pipeline.
+        
+        Args:
+            audio_file_paths: Paths to audio files
+            batch_size: Segments decoded per batch
+            
+        Returns:
+            Transcribed text per file, in order ("" for a file that failed)
+        """
+        if not self.whisper_model:
+            logger.error("Whisper model not available")
+            return [""] * len(audio_file_paths)
+        
+        if BatchedInferencePipeline is None:
+            return [self.transcribe_file(path) for path in audio_file_paths]
+        
+        def _decode(path: str):
+            try:
+                return decode_audio(path, sampling_rate=self.config.sample_rate)
+            except Exception as e:
+                logger.error(f"Failed to decode {path}: {e}")
+                return None
+        
+        with ThreadPoolExecutor(max_workers=min(4, len(audio_file_paths) or 1)) as pool:
+            decoded = list(pool.map(_decode, audio_file_paths))
+        
+        pipeline = BatchedInferencePipeline(model=self.whisper_model)
+        texts = []
+        for path, audio in zip(audio_file_paths, decoded):
+            if audio is None:
+                texts.append("")
+                continue
+            try:
+                segments, info = pipeline.transcribe(
+                    audio,
+                    language="en",
+                    task="transcribe",
+                    batch_size=batch_size
+                )
+                texts.append(" ".join([segment.text for segment in segments]).strip())
+            except Exception as e:
+                logger.error(f"File transcription error for {path}: {e}")
+                texts.append("")
+        return texts
+    
     def text_to_speech(self, text: str, voice_id: str = None) -> Optional[bytes]:
         """
         Convert text to speech using Eleven Labs.
@@ -376,41 +645,245 @@ class VoiceEngine:
             return None
             
         voice_id = voice_id or self.config.elevenlabs_voice_id
-        
-        # Check cache first
-        cache_key = f"{voice_id}:{hash(text)}"
-        if cache_key in self.tts_cache:
-            return self.tts_cache[cache_key]
+        audio, cache_entry = self._tts_lookup(text, voice_id)
+        if audio is not None:
+            return audio
         
         try:
-            audio = generate(
-                text=text,
-                voice=Voice(
-                    voice_id=voice_id,
-                    settings={
-                        "stability": self.config.elevenlabs_stability,
-                        "similarity_boost": self.config.elevenlabs_clarity,
-                        "style": self.config.elevenlabs_style
-                    }
-                )
-            )
-            
-            # Cache the result
-            self.tts_cache[cache_key] = audio
-            
-            # Limit cache size
-            if len(self.tts_cache) > 50:
-                # Remove oldest entries
-                oldest_keys = list(self.tts_cache.keys())[:10]
-                for key in oldest_keys:
-                    del self.tts_cache[key]
-            
+            audio = generate(text=text, voice=self._tts_voice(voice_id))
+            self._tts_store(cache_entry, audio)
             return audio
             
         except Exception as e:
             logger.error(f"TTS error: {e}")
             return None
     
+    def speak(self, text: str, voice_id: str = None):
+        """
+        Speak text, starting playback while Eleven Labs is still streaming it.
+        
+        Cached audio is played directly. Without miniaudio the clip is
+        synthesized in full first, as with text_to_speech() + play_audio().
+        
+        Args:
+            text: Text to speak
+            voice_id: Voice ID to use (optional, uses config default)
+        """
+        if not self.elevenlabs_configured or not generate:
+            logger.error("Eleven Labs not configured or available")
+            return
+        
+        voice_id = voice_id or self.config.elevenlabs_voice_id
+        audio, cache_entry = self._tts_lookup(text, voice_id)
+        if audio is None and miniaudio is not None and sd is not None:
+            try:
+                source = _ChunkSource(generate(text=text, voice=self._tts_voice(voice_id), stream=True))
+                self._play_stream(miniaudio.stream_any(
+                    source,
+                    source_format=miniaudio.FileFormat.MP3,
+                    output_format=miniaudio.SampleFormat.SIGNED16,
+                    nchannels=1,
+                    sample_rate=PLAYBACK_SAMPLE_RATE
+                ))
+                self._tts_store(cache_entry, bytes(source.data))
+            except Exception as e:
+                logger.error(f"TTS streaming error: {e}")
+            return
+        
+        if audio is None:
+            audio = self.text_to_speech(text, voice_id)
+        if audio:
+            self.play_audio(audio)
+    
+    def _tts_voice(self, voice_id: str):
+        """Build the Eleven Labs voice with the configured settings."""
+        return Voice(
+            voice_id=voice_id,
+            settings={
+                "stability": self.config.elevenlabs_stability,
+                "similarity_boost": self.config.elevenlabs_clarity,
+                "style": self.config.elevenlabs_style
+            }
+        )
+    
+    def _tts_lookup(self, text: str, voice_id: str) -> tuple:
+        """
+        Look text up in the memory, disk and semantic TTS caches.
+        
+        Returns (audio or None, cache entry); pass the entry to _tts_store()
+        after synthesizing on a miss.
+        """
+        # Every generation setting is part of the key, so changing one never replays stale audio
+        settings = (
+            self.config.elevenlabs_stability,
+            self.config.elevenlabs_clarity,
+            self.config.elevenlabs_style
+        )
+        cache_key = (voice_id, *settings, text)
+        audio = self._tts_cache_get(cache_key)
+        if audio is not None:
+            return audio, None
+        
+        settings_tag = ":".join(str(value) for value in settings)
+        digest = _text_hash(f"{settings_tag}:{text}".encode()).hexdigest()[:32]
+        audio = self._read_tts_file(voice_id, digest)
+        if audio is not None:
+            self._tts_cache_put(cache_key, audio)
+            return audio, None
+        
+        # Text naming numbers, IPs or hosts must be spoken verbatim ("port 22" is not
+        # "port 23"), so it skips the semantic tier. No-op (embedding is None) when
+        # sentence-transformers is not installed
+        namespace = f"{voice_id}:{settings_tag}"
+        embedding = None if identifier_key(text) else self._semantic_tts_cache.embed(text)
+        audio = self._semantic_tts_cache.lookup(embedding, namespace=namespace)
+        return audio, (voice_id, namespace, digest, cache_key, embedding)
+    
+    def _tts_store(self, cache_entry: tuple, audio: bytes):
+        """Add synthesized audio to every TTS cache."""
+        if not audio:
+            return
+        voice_id, namespace, digest, cache_key, embedding = cache_entry
+        self._tts_cache_put(cache_key, audio)
+        self._semantic_tts_cache.insert(embedding, audio, namespace=namespace)
+        self._write_tts_file(voice_id, digest, audio)
+    
+    def speak_stream(self, sentences: Iterable[str], voice_id: str = None):
+        """
+        Synthesize and play sentences in order as they arrive.
+        
+        The first sentence is streamed with speak() so playback starts as
+        early as possible; later sentences are synthesized concurrently (up
+        to config.tts_max_concurrency at once) while earlier ones play.
+        
+        Args:
+            sentences: Sentences to speak, e.g. iter_sentences() over an LLM stream
+            voice_id: Voice ID to use (optional, uses config default)
+        """
+        pending = queue.Queue()  # (sentence, future or None to stream it), None when done
+        
+        def _submit():
+            try:
+                for i, sentence in enumerate(sentences):
+                    future = None if i == 0 else self._tts_executor.submit(self.text_to_speech, sentence, voice_id)
+                    pending.put((sentence, future))
+            except Exception as e:
+                logger.error(f"Error reading sentences to speak: {e}")
+            finally:
+                pending.put(None)
+        
+        threading.Thread(target=_submit, name="tts-submit", daemon=True).start()
+        while (item := pending.get()) is not None:
+            sentence, future = item
+            if future is None:
+                self.speak(sentence, voice_id)
+                continue
+            audio_data = future.result()
+            if audio_data:
+                self.play_audio(audio_data)
+    
+    def _tts_cache_get(self, key: tuple) -> Optional[bytes]:
+        """Return a clip from the memory cache, marking it as recently used."""
+        with self._tts_cache_lock:
+            audio = self.tts_cache.get(key)
+            if audio is not None:
+                self.tts_cache.move_to_end(key)
+            return audio
+    
+    def _tts_cache_put(self, key: tuple, audio: bytes):
+        """Add a clip to the memory cache, evicting least recently used clips over the byte limit."""
+        limit = self.config.tts_memory_cache_mb * 1024 * 1024
+        with self._tts_cache_lock:
+            previous = self.tts_cache.pop(key, None)
+            if previous is not None:
+                self._tts_cache_bytes -= len(previous)
+            self.tts_cache[key] = audio
+            self._tts_cache_bytes += len(audio)
+            
+            # Always keep the clip just added
+            while self._tts_cache_bytes > limit and len(self.tts_cache) > 1:
+                _, evicted = self.tts_cache.popitem(last=False)
+                self._tts_cache_bytes -= len(evicted)
+    
+    def _tts_file(self, voice_id: str, digest: str) -> Optional[str]:
+        """Path of a cached TTS clip, or None if the disk cache is disabled."""
+        if not self.config.tts_cache_dir:
+            return None
+        return os.path.join(os.path.expanduser(self.config.tts_cache_dir), voice_id, f"{digest}.mp3")
+    
+    def _read_tts_file(self, voice_id: str, digest: str) -> Optional[bytes]:
+        """Load a clip from the disk cache, marking it as recently used."""
+        path = self._tts_file(voice_id, digest)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                audio = f.read()
+            os.utime(path)
+            return audio
+        except OSError:
+            return None
+    
+    def _write_tts_file(self, voice_id: str, digest: str, audio: bytes):
+        """Store a clip in the disk cache and trim the cache to its size limit."""
+        path = self._tts_file(voice_id, digest)
+        if path is None or not isinstance(audio, bytes):
+            return
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename so readers never see a partial clip; the temp file is
+            # unique so synthesis threads writing the same clip don't collide
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(audio)
+                os.replace(tmp_path, path)
+            except OSError:
+                with contextlib.suppress(OSError):
+                    os.remove(tmp_path)
+                raise
+            
+            # The directory is only scanned when the running total passes the limit
+            limit = self.config.tts_cache_max_mb * 1024 * 1024
+            with self._tts_disk_lock:
+                if self._tts_disk_bytes is not None:
+                    self._tts_disk_bytes += len(audio)
+                if self._tts_disk_bytes is None or self._tts_disk_bytes > limit:
+                    self._tts_disk_bytes = self._trim_tts_files()
+        except OSError as e:
+            logger.warning(f"Failed to cache TTS audio on disk: {e}")
+    
+    def _trim_tts_files(self) -> int:
+        """
+        Remove the least recently used clips once the disk cache is over its limit.
+        
+        Trims to 90% of the limit, so the next scan is several writes away.
+        Returns the remaining size in bytes.
+        """
+        root = os.path.expanduser(self.config.tts_cache_dir)
+        files = []
+        for voice_dir in os.scandir(root):
+            if voice_dir.is_dir():
+                for entry in os.scandir(voice_dir.path):
+                    if entry.name.endswith(".mp3"):
+                        stat = entry.stat()
+                        files.append((stat.st_mtime, stat.st_size, entry.path))
+        
+        total = sum(size for _, size, _ in files)
+        limit = self.config.tts_cache_max_mb * 1024 * 1024
+        if total <= limit:
+            return total
+        target = limit * 0.9
+        for _, size, path in sorted(files):
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+                total -= size
+            except OSError:
+                pass
+        return total
+    
     def play_audio(self, audio_data: bytes):
         """
         Play audio data.
@@ -421,28 +894,47 @@ class VoiceEngine:
         if not sd or not np:
             logger.error("sounddevice or numpy not available")
             return
+        
+        if miniaudio is None:
+            logger.error("miniaudio not available, cannot decode audio")
+            return
             
         try:
-            # Save to temporary file and load with sounddevice
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_file:
-                tmp_file.write(audio_data)
-                tmp_file.flush()
-                
-                # Load and play
-                data, fs = sd.read(tmp_file.name)
-                sd.play(data, fs)
-                sd.wait()  # Wait until playback is finished
-                
-                # Clean up
-                os.unlink(tmp_file.name)
+            # Decode in memory and write the samples straight to the output stream
+            decoded = miniaudio.decode(
+                audio_data,
+                output_format=miniaudio.SampleFormat.SIGNED16,
+                nchannels=1,
+                sample_rate=PLAYBACK_SAMPLE_RATE
+            )
+            self._play_stream([decoded.samples])
                 
         except Exception as e:
             logger.error(f"Audio playback error: {e}")
     
+    def _play_stream(self, blocks: Iterable[Any]):
+        """Write int16 sample blocks to the shared output stream, one clip at a time."""
+        with self._playback_lock:
+            if self._output_stream is None:
+                self._output_stream = sd.RawOutputStream(
+                    samplerate=PLAYBACK_SAMPLE_RATE,
+                    channels=1,
+                    dtype="int16",
+                    device=self.config.output_device
+                )
+                self._output_stream.start()
+            for block in blocks:
+                if len(block):
+                    self._output_stream.write(block)
+    
     def get_status(self) -> Dict[str, Any]:
         """Get current status of the voice engine."""
         return {
-            "whisper_available": self.whisper_model is not None,
+            # Don't block on a model that is still loading
+            "whisper_available": self._whisper_future is not None and (
+                not self._whisper_future.done() or self._whisper_future.result() is not None
+            ),
+            "whisper_loading": self._whisper_future is not None and not self._whisper_future.done(),
             "vad_available": self.vad is not None,
             "elevenlabs_configured": self.elevenlabs_configured,
             "is_listening": self.is_listening,
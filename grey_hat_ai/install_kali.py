@@ -8,58 +8,204 @@ on Kali Linux systems.
 
 import os
 import sys
+import argparse
+import asyncio
+import functools
+import importlib
+import json
+import shlex
+import shutil
 import subprocess
 import logging
+import time
 from pathlib import Path
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Resolved once, so every stage agrees on them even if the working directory changes
+CWD = Path.cwd()
+HOME = Path.home()
+CONFIG_DIR = HOME / ".grey_hat_ai"
+LAUNCHER_PATH = CWD / "launch_grey_hat_ai.sh"
+
+# Results of earlier runs, so a re-run skips stages that are already satisfied
+INSTALL_CACHE_PATH = CONFIG_DIR / ".install_cache.json"
+
+# apt package lists younger than this (seconds) are not refreshed
+APT_UPDATE_TTL = int(os.environ.get("GREY_HAT_APT_UPDATE_TTL", 24 * 60 * 60))
+APT_UPDATE_STAMPS = [Path("/var/lib/apt/periodic/update-success-stamp"), Path("/var/lib/apt/lists")]
+
+# Packages that provide a command of the same name; finding it on PATH is enough
+COMMAND_PACKAGES = {"ffmpeg", "git", "curl", "wget"}
+
+# Persistent wheel cache, so re-installs are served locally
+PIP_CACHE_DIR = HOME / ".cache" / "grey_hat_ai" / "pip"
+
+# Pre-resolved pins (pip freeze of a known-good install); used when present so pip skips backtracking
+CONSTRAINTS_FILE = CWD / "constraints.txt"
+
+# Output of commands that is neither captured nor streamed
+INSTALL_LOG_PATH = HOME / ".cache" / "grey_hat_ai" / "install.log"
+
+def _launch_failed(args, error):
+    """Log a command that could not be started and build its failed result."""
+    logger.error(f"Command failed: {args if isinstance(args, str) else shlex.join(map(str, args))}")
+    logger.error(f"Error: {error}")
+    return subprocess.CompletedProcess(args, 127, "", str(error))
+
 def run_command(command, check=True, shell=False):
-    """Run a shell command and return the result."""
+    """
+    Run a command (an argument list, or a string to parse) and return the result.
+    
+    Failures are reported through the result's returncode; with check=True
+    they are also logged. A command that can't be started at all (missing or
+    not executable) is always logged and reported as returncode 127.
+    """
+    args = shlex.split(command) if isinstance(command, str) and not shell else command
     try:
-        if shell:
-            result = subprocess.run(command, shell=True, check=check, capture_output=True, text=True)
-        else:
-            result = subprocess.run(command.split(), check=check, capture_output=True, text=True)
-        return result
-    except subprocess.CalledProcessError as e:
+        result = subprocess.run(args, shell=shell, capture_output=True, text=True)
+    except OSError as e:
+        return _launch_failed(args, e)
+    if check and result.returncode != 0:
         logger.error(f"Command failed: {command}")
-        logger.error(f"Error: {e.stderr}")
-        if check:
-            raise
-        return e
+        logger.error(f"Error: {result.stderr}")
+    return result
+
+async def run_command_async(command, check=True, env=None, stream=False, capture=False):
+    """
+    Run a command without blocking the event loop and return the result.
+    
+    The command is an argument list, or a string to parse. stdout is
+    returned only with capture=True; with stream=True it is forwarded to
+    the log line by line as it is produced, and otherwise it is appended to
+    INSTALL_LOG_PATH. stderr is always kept for the error report.
+    
+    Failures are reported through the result's returncode; with check=True
+    they are also logged. A command that can't be started at all (missing or
+    not executable) is always logged and reported as returncode 127.
+    """
+    args = shlex.split(command) if isinstance(command, str) else [str(arg) for arg in command]
+    log_file = None
+    try:
+        if stream or capture:
+            stdout = asyncio.subprocess.PIPE
+        else:
+            INSTALL_LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+            stdout = log_file = open(INSTALL_LOG_PATH, "ab")
+        proc = await asyncio.create_subprocess_exec(
+            *args, stdout=stdout, stderr=asyncio.subprocess.PIPE, env=env
+        )
+    except OSError as e:
+        return _launch_failed(args, e)
+    finally:
+        # The child holds its own descriptor
+        if log_file is not None:
+            log_file.close()
+    if stream:
+        # stderr is drained concurrently so a chatty command can't block on a full pipe
+        stderr_read = asyncio.create_task(proc.stderr.read())
+        async for line in proc.stdout:
+            logger.info(line.decode(errors="replace").rstrip())
+        stdout, stderr = b"", await stderr_read
+        await proc.wait()
+    else:
+        stdout, stderr = await proc.communicate()
+    result = subprocess.CompletedProcess(args, proc.returncode, (stdout or b"").decode(), stderr.decode())
+    if check and result.returncode != 0:
+        logger.error(f"Command failed: {shlex.join(args)}")
+        logger.error(f"Error: {result.stderr}")
+    return result
 
-def check_system_requirements():
+def _write_file(path, content, mode=None):
+    with open(path, "w") as f:
+        f.write(content)
+    if mode is not None:
+        os.chmod(path, mode)
+
+async def write_file(path, content, mode=None):
+    """Write a text file (and set its mode) in a worker thread, so several writes overlap."""
+    await asyncio.to_thread(_write_file, path, content, mode)
+
+def load_install_cache():
+    """Load the results recorded by earlier runs (empty if there are none)."""
+    try:
+        with open(INSTALL_CACHE_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_install_cache(cache):
+    """Record stage results for the next run."""
+    INSTALL_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    cache["timestamp"] = time.time()
+    with open(INSTALL_CACHE_PATH, "w") as f:
+        json.dump(cache, f, indent=2)
+
+@functools.lru_cache(maxsize=1)
+def system_info():
+    """Platform and Python version, as recorded in the install cache."""
+    return {"platform": sys.platform, "python_version": list(sys.version_info[:3])}
+
+def check_system_requirements(cache):
     """Check if the system meets requirements."""
     logger.info("Checking system requirements...")
     
+    current = system_info()
+    if all(cache.get(key) == value for key, value in current.items()):
+        logger.info("✅ System requirements met (cached)")
+        return True
+    
     # Check if running on Linux
-    if sys.platform != "linux":
+    if current["platform"] != "linux":
         logger.error("This installer is designed for Linux systems (specifically Kali Linux)")
         return False
     
     # Check Python version
-    if sys.version_info < (3, 9):
+    if tuple(current["python_version"]) < (3, 9):
         logger.error("Python 3.9 or higher is required")
         return False
     
+    cache.update(current)
     logger.info("✅ System requirements met")
     return True
 
-def install_system_dependencies():
-    """Install system-level dependencies."""
+async def missing_packages(packages):
+    """Return the packages dpkg does not report as installed, with one dpkg-query call."""
+    # Tools already on PATH need no dpkg lookup
+    packages = [
+        package for package in packages
+        if not (package in COMMAND_PACKAGES and shutil.which(package))
+    ]
+    if not packages:
+        return []
+    result = await run_command_async(
+        ["dpkg-query", "-W", "-f=${Package} ${Status}\\n", *packages], check=False, capture=True
+    )
+    installed = {
+        line.split()[0] for line in result.stdout.splitlines() if line.endswith("install ok installed")
+    }
+    return [package for package in packages if package not in installed]
+
+def apt_lists_fresh():
+    """Whether apt's package lists were updated within APT_UPDATE_TTL."""
+    for stamp in APT_UPDATE_STAMPS:
+        try:
+            return time.time() - stamp.stat().st_mtime < APT_UPDATE_TTL
+        except OSError:
+            continue
+    return False
+
+async def install_system_dependencies(cache):
+    """Install system-level dependencies. Returns whether apt could run."""
     logger.info("Installing system dependencies...")
     
-    # Update package list
-    logger.info("Updating package list...")
-    run_command("sudo apt update")
-    
-    # Install required system packages
+    # Required system packages
     packages = [
         "python3-pip",
         "python3-venv",
+        "python3-virtualenv",
         "python3-dev",
         "build-essential",
         "portaudio19-dev",
@@ -71,35 +217,88 @@ def install_system_dependencies():
         "wget"
     ]
     
-    logger.info("Installing system packages...")
-    for package in packages:
-        logger.info(f"Installing {package}...")
-        result = run_command(f"sudo apt install -y {package}", check=False)
-        if result.returncode != 0:
-            logger.warning(f"Failed to install {package}, continuing...")
+    # Only packages no earlier run has installed are checked with dpkg, and only missing ones installed
+    recorded = set(cache.get("apt_pkgs_installed", []))
+    missing = await missing_packages([package for package in packages if package not in recorded])
+    if not missing:
+        cache["apt_pkgs_installed"] = packages
+        logger.info("✅ System dependencies already installed")
+        return True
     
+    # Update package list
+    if apt_lists_fresh():
+        logger.info("Package lists are fresh, skipping update")
+    else:
+        logger.info("Updating package list...")
+        if (await run_command_async(["sudo", "apt-get", "update"])).returncode != 0:
+            return False
+    
+    # One apt-get run resolves and unpacks everything at once
+    logger.info(f"Installing system packages: {' '.join(missing)}")
+    result = await run_command_async(
+        ["sudo", "apt-get", "install", "-y", "-o", "Dpkg::Use-Pty=0", *missing], check=False, stream=True
+    )
+    if result.returncode != 0:
+        # Retry one by one so a single unavailable package doesn't block the rest
+        logger.warning("Batched install failed, retrying packages individually...")
+        for package in missing:
+            logger.info(f"Installing {package}...")
+            result = await run_command_async(
+                ["sudo", "apt-get", "install", "-y", "-o", "Dpkg::Use-Pty=0", package], check=False
+            )
+            if result.returncode != 0:
+                logger.warning(f"Failed to install {package}, continuing...")
+        missing = await missing_packages(missing)
+    else:
+        missing = []
+    
+    cache["apt_pkgs_installed"] = [package for package in packages if package not in missing]
     logger.info("✅ System dependencies installed")
+    return True
+
+async def download_playwright_browser(venv_path):
+    """Download Playwright's Chromium build into the browser cache. Returns whether it succeeded."""
+    python_path = venv_path / "bin" / "python"
+    result = await run_command_async([python_path, "-m", "playwright", "install", "chromium"])
+    return result.returncode == 0
 
-def install_playwright():
-    """Install Playwright and its browsers."""
+async def install_playwright(venv_path, browser_download):
+    """Install Playwright's browsers once the download started earlier finishes."""
     logger.info("Installing Playwright browsers...")
     
-    try:
-        # Install playwright browsers
-        run_command("python3 -m playwright install chromium")
-        run_command("python3 -m playwright install-deps chromium")
+    python_path = venv_path / "bin" / "python"
+    
+    # Wait for the browser, then install its system libraries (apt, so after the apt stage)
+    if await browser_download and (
+        await run_command_async([python_path, "-m", "playwright", "install-deps", "chromium"])
+    ).returncode == 0:
         logger.info("✅ Playwright browsers installed")
-    except subprocess.CalledProcessError:
+    else:
         logger.warning("⚠️ Playwright browser installation failed, continuing...")
 
 def create_virtual_environment():
-    """Create and activate virtual environment."""
+    """Create virtual environment. Returns (venv path, activation script), or None if it failed."""
     logger.info("Creating virtual environment...")
     
-    venv_path = Path.home() / "grey_hat_ai_venv"
+    venv_path = HOME / "grey_hat_ai_venv"
+    
+    # virtualenv seeds pip from its cached wheels instead of bootstrapping ensurepip;
+    # it is imported here since the apt stage may have only just installed it
+    importlib.invalidate_caches()
+    try:
+        from virtualenv import cli_run
+    except ImportError:
+        cli_run = None
     
     # Create virtual environment
-    run_command(f"python3 -m venv {venv_path}")
+    if cli_run is not None:
+        try:
+            cli_run([str(venv_path), "--seeder", "app-data"])
+        except Exception as e:
+            logger.error(f"Failed to create virtual environment: {e}")
+            return None
+    elif run_command(["python3", "-m", "venv", str(venv_path)]).returncode != 0:
+        return None
     
     # Get activation script path
     activate_script = venv_path / "bin" / "activate"
@@ -107,21 +306,38 @@ def create_virtual_environment():
     logger.info(f"✅ Virtual environment created at {venv_path}")
     return venv_path, activate_script
 
-def install_python_dependencies(venv_path):
+async def pip_install(venv_path, *arguments):
+    """Run pip install in the virtual environment, preferring wheels. Returns whether it succeeded."""
+    pip_path = venv_path / "bin" / "pip"
+    env = {
+        **os.environ,
+        "PIP_CACHE_DIR": str(PIP_CACHE_DIR),
+        "PIP_DISABLE_PIP_VERSION_CHECK": "1",
+        "PIP_NO_INPUT": "1"
+    }
+    command = [pip_path, "install", "--no-input", "--disable-pip-version-check", "--prefer-binary"]
+    if CONSTRAINTS_FILE.exists():
+        command += ["-c", CONSTRAINTS_FILE]
+    result = await run_command_async([*command, *arguments], env=env, stream=True)
+    return result.returncode == 0
+
+async def install_build_tools(venv_path):
+    """Upgrade the build tooling and install Playwright, ahead of the other dependencies."""
+    logger.info("Installing build tools and Playwright...")
+    return await pip_install(venv_path, "--upgrade", "pip", "wheel", "setuptools", "playwright")
+
+async def install_python_dependencies(venv_path):
     """Install Python dependencies in virtual environment."""
     logger.info("Installing Python dependencies...")
     
-    pip_path = venv_path / "bin" / "pip"
-    
-    # Upgrade pip
-    run_command(f"{pip_path} install --upgrade pip")
-    
     # Install the package in development mode
-    run_command(f"{pip_path} install -e .")
+    if not await pip_install(venv_path, "-e", "."):
+        return False
     
     logger.info("✅ Python dependencies installed")
+    return True
 
-def create_launcher_script(venv_path):
+async def create_launcher_script(venv_path, launcher_path):
     """Create a launcher script for Grey Hat AI."""
     logger.info("Creating launcher script...")
     
@@ -132,7 +348,7 @@ def create_launcher_script(venv_path):
 source {venv_path}/bin/activate
 
 # Set environment variables
-export PYTHONPATH="{os.getcwd()}:$PYTHONPATH"
+export PYTHONPATH="{CWD}:$PYTHONPATH"
 
 # Launch Grey Hat AI
 echo "🎯 Starting Grey Hat AI..."
@@ -145,18 +361,12 @@ streamlit run grey_hat_ai/app.py --server.port 8501 --server.address 0.0.0.0
 deactivate
 """
     
-    launcher_path = Path(os.getcwd()) / "launch_grey_hat_ai.sh"
-    
-    with open(launcher_path, "w") as f:
-        f.write(launcher_content)
-    
-    # Make executable
-    os.chmod(launcher_path, 0o755)
+    # Write it executable
+    await write_file(launcher_path, launcher_content, 0o755)
     
     logger.info(f"✅ Launcher script created at {launcher_path}")
-    return launcher_path
 
-def create_desktop_entry(launcher_path):
+async def create_desktop_entry(launcher_path):
     """Create a desktop entry for Grey Hat AI."""
     logger.info("Creating desktop entry...")
     
@@ -171,24 +381,29 @@ Terminal=true
 Categories=Security;Network;
 """
     
-    desktop_dir = Path.home() / ".local" / "share" / "applications"
+    desktop_dir = HOME / ".local" / "share" / "applications"
     desktop_dir.mkdir(parents=True, exist_ok=True)
     
     desktop_path = desktop_dir / "grey-hat-ai.desktop"
     
-    with open(desktop_path, "w") as f:
-        f.write(desktop_content)
-    
-    # Make executable
-    os.chmod(desktop_path, 0o755)
+    # Write it executable
+    await write_file(desktop_path, desktop_content, 0o755)
     
     logger.info(f"✅ Desktop entry created at {desktop_path}")
 
-def setup_configuration():
+async def create_shortcuts(venv_path):
+    """Create the launcher script and the desktop entry pointing at it, side by side."""
+    await asyncio.gather(
+        create_launcher_script(venv_path, LAUNCHER_PATH),
+        create_desktop_entry(LAUNCHER_PATH)
+    )
+    return LAUNCHER_PATH
+
+async def setup_configuration():
     """Set up configuration directory and files."""
     logger.info("Setting up configuration...")
     
-    config_dir = Path.home() / ".grey_hat_ai"
+    config_dir = CONFIG_DIR
     config_dir.mkdir(exist_ok=True)
     
     # Create example configuration file
@@ -215,93 +430,122 @@ HEADLESS=true
     config_path = config_dir / "config.env"
     
     if not config_path.exists():
-        with open(config_path, "w") as f:
-            f.write(config_content)
+        await write_file(config_path, config_content)
     
     logger.info(f"✅ Configuration directory created at {config_dir}")
 
 def print_installation_summary(launcher_path, venv_path):
     """Print installation summary and usage instructions."""
-    print("\n" + "="*60)
-    print("🎯 GREY HAT AI INSTALLATION COMPLETE!")
-    print("="*60)
-    print()
-    print("📁 Installation Details:")
-    print(f"   • Virtual Environment: {venv_path}")
-    print(f"   • Launcher Script: {launcher_path}")
-    print(f"   • Configuration: {Path.home()}/.grey_hat_ai/")
-    print()
-    print("🚀 How to Launch:")
-    print("   Option 1: Run the launcher script")
-    print(f"   $ {launcher_path}")
-    print()
-    print("   Option 2: Use the desktop entry")
-    print("   Search for 'Grey Hat AI' in your applications menu")
-    print()
-    print("   Option 3: Manual launch")
-    print(f"   $ source {venv_path}/bin/activate")
-    print("   $ streamlit run grey_hat_ai/app.py")
-    print()
-    print("🔧 Configuration:")
-    print("   • Use the GUI sidebar to configure API keys")
-    print("   • Supported LLMs: Google Gemini, Mistral AI, Groq")
-    print("   • Voice support: Eleven Labs TTS + local Whisper STT")
-    print("   • Web automation: Playwright-based autonomous agent")
-    print()
-    print("📚 Documentation:")
-    print("   • README.md - General information and features")
-    print("   • docs/ - Detailed documentation and guides")
-    print()
-    print("⚠️  Important Notes:")
-    print("   • Configure at least one LLM API key to use the system")
-    print("   • Voice features require microphone permissions")
-    print("   • Web automation requires internet access")
-    print("   • Use responsibly and only on authorized targets")
-    print()
-    print("🎯 Happy Hacking!")
-    print("="*60)
+    rule = "=" * 60
+    sys.stdout.write(f"""
+{rule}
+🎯 GREY HAT AI INSTALLATION COMPLETE!
+{rule}
+
+📁 Installation Details:
+   • Virtual Environment: {venv_path}
+   • Launcher Script: {launcher_path}
+   • Configuration: {CONFIG_DIR}/
+
+🚀 How to Launch:
+   Option 1: Run the launcher script
+   $ {launcher_path}
+
+   Option 2: Use the desktop entry
+   Search for 'Grey Hat AI' in your applications menu
+
+   Option 3: Manual launch
+   $ source {venv_path}/bin/activate
+   $ streamlit run grey_hat_ai/app.py
+
+🔧 Configuration:
+   • Use the GUI sidebar to configure API keys
+   • Supported LLMs: Google Gemini, Mistral AI, Groq
+   • Voice support: Eleven Labs TTS + local Whisper STT
+   • Web automation: Playwright-based autonomous agent
+
+📚 Documentation:
+   • README.md - General information and features
+   • docs/ - Detailed documentation and guides
+
+⚠️  Important Notes:
+   • Configure at least one LLM API key to use the system
+   • Voice features require microphone permissions
+   • Web automation requires internet access
+   • Use responsibly and only on authorized targets
+
+🎯 Happy Hacking!
+{rule}
+""")
+    sys.stdout.flush()
+
+async def amain(force=False):
+    """
+    Run the installation stages, overlapping the ones that don't depend on each other.
+    
+    Returns:
+        Exit status: 0 once installed, 1 as soon as a required stage fails
+    """
+    cache = {} if force else load_install_cache()
+    
+    # Check system requirements
+    if not check_system_requirements(cache):
+        return 1
+    
+    # Install system dependencies while the configuration is written
+    system_ok, _ = await asyncio.gather(
+        install_system_dependencies(cache),
+        setup_configuration()
+    )
+    save_install_cache(cache)
+    if not system_ok:
+        return 1
+    
+    # Create virtual environment (needs python3-venv from apt)
+    venv = create_virtual_environment()
+    if venv is None:
+        return 1
+    venv_path, activate_script = venv
+    
+    # Playwright goes in first so its ~150MB browser download overlaps the full dependency install
+    if not await install_build_tools(venv_path):
+        return 1
+    browser_download = asyncio.create_task(download_playwright_browser(venv_path))
+    
+    # Install Python dependencies and the shortcuts side by side
+    dependencies_ok, launcher_path = await asyncio.gather(
+        install_python_dependencies(venv_path),
+        create_shortcuts(venv_path)
+    )
+    if not dependencies_ok:
+        return 1
+    
+    # Install Playwright
+    await install_playwright(venv_path, browser_download)
+    
+    # Print summary
+    print_installation_summary(launcher_path, venv_path)
+    return 0
 
 def main():
     """Main installation function."""
+    parser = argparse.ArgumentParser(description="Install Grey Hat AI on Kali Linux")
+    parser.add_argument("--force", action="store_true",
+                        help="ignore results cached by earlier runs and redo every stage")
+    args = parser.parse_args()
+    
     print("🎯 Grey Hat AI Installer for Kali Linux")
     print("="*50)
     
     try:
-        # Check system requirements
-        if not check_system_requirements():
-            sys.exit(1)
-        
-        # Install system dependencies
-        install_system_dependencies()
-        
-        # Create virtual environment
-        venv_path, activate_script = create_virtual_environment()
-        
-        # Install Python dependencies
-        install_python_dependencies(venv_path)
-        
-        # Install Playwright
-        install_playwright()
-        
-        # Create launcher script
-        launcher_path = create_launcher_script(venv_path)
-        
-        # Create desktop entry
-        create_desktop_entry(launcher_path)
-        
-        # Setup configuration
-        setup_configuration()
-        
-        # Print summary
-        print_installation_summary(launcher_path, venv_path)
-        
+        status = asyncio.run(amain(force=args.force))
     except KeyboardInterrupt:
         print("\n❌ Installation cancelled by user")
-        sys.exit(1)
-    except Exception as e:
-        logger.error(f"Installation failed: {e}")
-        sys.exit(1)
+        status = 1
+    else:
+        if status != 0:
+            logger.error("Installation failed")
+    sys.exit(status)
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,266 @@
+import asyncio
+
+import httpx
+import pytest
+
+from grey_hat_ai.autonomous_web_agent import (
+    AutonomousWebAgent,
+    WebAgentConfig,
+    _is_text_content,
+    _needs_javascript,
+)
+
+
+def test_needs_javascript_for_empty_shell():
+    html = (
+        "<html><head><script>" + "var app = {};" * 100 + "</script></head>"
+        "<body><div id='root'></div><noscript>Enable JavaScript</noscript></body></html>"
+    )
+
+    assert _needs_javascript(html)
+
+
+def test_needs_javascript_false_for_static_text():
+    html = "<html><body><article><p>" + "Static page content. " * 20 + "</p></article></body></html>"
+
+    assert not _needs_javascript(html)
+
+
+def test_needs_javascript_false_for_non_markup_text():
+    assert not _needs_javascript("User-agent: *\nDisallow: /admin\n" * 10)
+
+
+@pytest.fixture
+def agent():
+    agent = AutonomousWebAgent()
+    agent._is_initialized = True
+    calls = []
+
+    def fake(name, result):
+        async def method(**kwargs):
+            calls.append((name, kwargs))
+            return dict(result)
+        return method
+
+    agent.navigate = fake("navigate", {"success": True, "url": "http://example.test"})
+    agent.click_element = fake("click", {"success": True})
+    agent.fill_form = fake("fill_form", {"success": False, "error": "No such field"})
+    agent.get_page_content = fake("get_content", {"success": True, "content": "page text"})
+    agent.calls = calls
+    return agent
+
+
+async def test_run_batch_returns_full_result_for_last_step(agent):
+    results = await agent.run_batch([
+        {"action": "navigate", "url": "http://example.test"},
+        {"action": "click", "selector": "#login"},
+    ], include_content=True)
+
+    assert results == [{"ok": True}, {"success": True, "content": "page text"}]
+    assert agent.calls == [
+        ("navigate", {"url": "http://example.test"}),
+        ("click", {"selector": "#login"}),
+        ("get_content", {}),
+    ]
+
+
+async def test_run_batch_stops_at_first_failure(agent):
+    results = await agent.run_batch([
+        {"action": "navigate", "url": "http://example.test"},
+        {"action": "fill_form", "form_data": {"#user": "admin"}},
+        {"action": "click", "selector": "#submit"},
+    ])
+
+    assert results == [{"ok": True}, {"success": False, "error": "No such field", "step": 1}]
+    assert [name for name, _ in agent.calls] == ["navigate", "fill_form"]
+
+
+async def test_run_batch_rejects_unknown_action(agent):
+    results = await agent.run_batch([{"action": "format_disk"}])
+
+    assert results == [{"success": False, "error": "Unsupported action: format_disk", "step": 0}]
+    assert agent.calls == []
+
+
+async def test_run_batch_reports_bad_arguments(agent):
+    async def click_element(selector):
+        return {"success": True}
+
+    agent.click_element = click_element
+
+    results = await agent.run_batch([{"action": "click", "bogus": 1}])
+
+    assert results[0]["success"] is False
+    assert results[0]["step"] == 0
+
+
+@pytest.mark.parametrize("content_type", [
+    "text/html; charset=utf-8", "text/plain", "application/json", "application/xml",
+    "image/svg+xml", "application/javascript", "",
+])
+def test_is_text_content(content_type):
+    assert _is_text_content(content_type)
+
+
+@pytest.mark.parametrize("content_type", [
+    "image/png", "application/pdf", "application/zip", "application/octet-stream",
+])
+def test_is_text_content_rejects_binary(content_type):
+    assert not _is_text_content(content_type)
+
+
+def _http_agent(handler):
+    agent = AutonomousWebAgent()
+    agent._is_initialized = True
+    agent._http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return agent
+
+
+async def test_navigate_fast_stops_reading_at_max_chars():
+    served = []
+
+    async def body():
+        for _ in range(100):
+            served.append(1)
+            yield b"x" * 1000
+
+    agent = _http_agent(lambda request: httpx.Response(200, headers={"content-type": "text/plain"}, content=body()))
+
+    result = await agent.navigate_fast("http://example.test/big.txt", max_chars=2500)
+
+    assert result["via"] == "http"
+    assert result["content"] == "x" * 2500
+    assert result["truncated"] is True
+    assert len(served) < 10
+
+
+async def test_navigate_fast_returns_whole_short_body():
+    agent = _http_agent(lambda request: httpx.Response(
+        200, headers={"content-type": "text/plain; charset=utf-8"}, content="User-agent: *\nDisallow: /é\n".encode()
+    ))
+
+    result = await agent.navigate_fast("http://example.test/robots.txt")
+
+    assert result["content"] == "User-agent: *\nDisallow: /é\n"
+    assert result["truncated"] is False
+
+
+async def test_navigate_fast_returns_metadata_for_binary():
+    agent = _http_agent(lambda request: httpx.Response(
+        200, headers={"content-type": "application/pdf", "content-length": "4"}, content=b"%PDF"
+    ))
+
+    result = await agent.navigate_fast("http://example.test/report.pdf")
+
+    assert result["success"] is True
+    assert result["content"] is None
+    assert result["content_type"] == "application/pdf"
+    assert result["content_length"] == "4"
+
+
+async def test_navigate_fast_loads_javascript_shell_in_browser():
+    agent = _http_agent(lambda request: httpx.Response(
+        200, headers={"content-type": "text/html"}, content=b"<html><body><div id='root'></div></body></html>"
+    ))
+
+    async def navigate(url):
+        return {"success": True, "url": url}
+
+    agent.navigate = navigate
+
+    result = await agent.navigate_fast("http://example.test/app")
+
+    assert result == {"success": True, "url": "http://example.test/app", "via": "browser"}
+
+
+class FakePage:
+    def __init__(self):
+        self.url = "http://example.test"
+
+    async def goto(self, url):
+        self.url = url
+
+
+class FakeContext:
+    def __init__(self):
+        self.pages = [FakePage()]
+        self.cookies_cleared = 0
+
+    async def clear_cookies(self):
+        self.cookies_cleared += 1
+
+
+@pytest.fixture
+def pool_agent():
+    agent = AutonomousWebAgent(WebAgentConfig(pool_size=2))
+    agent._is_initialized = True
+    agent._context_pool = asyncio.Queue()
+    agent.opened = []
+
+    async def new_context():
+        context = FakeContext()
+        agent.opened.append(context)
+        return context
+
+    agent._new_context = new_context
+    return agent
+
+
+async def test_pool_opens_contexts_on_first_use(pool_agent):
+    assert pool_agent.opened == []
+
+    context = await pool_agent.acquire_context()
+
+    assert pool_agent.opened == [context]
+
+
+async def test_pool_reuses_released_context(pool_agent):
+    context = await pool_agent.acquire_context()
+    context.pages[0].url = "http://example.test/login"
+    await pool_agent.release_context(context)
+
+    reused = await pool_agent.acquire_context()
+
+    assert reused is context
+    assert len(pool_agent.opened) == 1
+    assert context.cookies_cleared == 1
+    assert context.pages[0].url == "about:blank"
+
+
+async def test_pool_waits_once_pool_size_contexts_are_borrowed(pool_agent):
+    first = await pool_agent.acquire_context()
+    await pool_agent.acquire_context()
+
+    waiting = asyncio.create_task(pool_agent.acquire_context())
+    await asyncio.sleep(0)
+    assert not waiting.done()
+
+    await pool_agent.release_context(first)
+
+    assert await asyncio.wait_for(waiting, timeout=1) is first
+    assert len(pool_agent.opened) == 2
+
+
+async def test_pool_frees_slot_when_opening_fails(pool_agent):
+    async def failing_context():
+        raise RuntimeError("browser crashed")
+
+    new_context = pool_agent._new_context
+    pool_agent._new_context = failing_context
+    with pytest.raises(RuntimeError):
+        await pool_agent.acquire_context()
+
+    pool_agent._new_context = new_context
+    await pool_agent.acquire_context()
+    await pool_agent.acquire_context()
+
+    assert len(pool_agent.opened) == 2
+
+
+async def test_pooled_session_returns_context_to_pool(pool_agent):
+    async with pool_agent.pooled_session() as session:
+        context = session.context
+        assert session.page is context.pages[0]
+        assert session._owns_browser is False
+
+    assert pool_agent._context_pool.get_nowait() is context
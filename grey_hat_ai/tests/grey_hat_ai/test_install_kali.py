@@ -0,0 +1,53 @@
+import subprocess
+
+import install_kali
+
+
+DPKG_OUTPUT = (
+    "nmap install ok installed\n"
+    "nikto deinstall ok config-files\n"
+    "sqlmap install ok installed\n"
+)
+
+
+def _fake_run_command_async(calls, stdout):
+    async def run_command_async(command, check=True, capture=False, **kwargs):
+        calls.append(command)
+        return subprocess.CompletedProcess(command, 0, stdout, "")
+    return run_command_async
+
+
+async def test_missing_packages_parses_dpkg_status(monkeypatch):
+    calls = []
+    monkeypatch.setattr(install_kali, "run_command_async", _fake_run_command_async(calls, DPKG_OUTPUT))
+    monkeypatch.setattr(install_kali.shutil, "which", lambda name: None)
+
+    missing = await install_kali.missing_packages(["nmap", "nikto", "sqlmap", "hydra"])
+
+    assert missing == ["nikto", "hydra"]
+    assert len(calls) == 1
+    assert calls[0][:3] == ["dpkg-query", "-W", "-f=${Package} ${Status}\\n"]
+
+
+async def test_missing_packages_skips_commands_on_path(monkeypatch):
+    calls = []
+    monkeypatch.setattr(install_kali, "run_command_async", _fake_run_command_async(calls, ""))
+    monkeypatch.setattr(install_kali.shutil, "which", lambda name: f"/usr/bin/{name}")
+
+    assert await install_kali.missing_packages(["git", "curl"]) == []
+    assert calls == []
+
+
+def test_run_command_reports_missing_binary():
+    result = install_kali.run_command(["grey-hat-no-such-command"], check=False)
+
+    assert result.returncode == 127
+    assert result.stderr
+
+
+async def test_run_command_async_reports_missing_binary():
+    result = await install_kali.run_command_async(
+        ["grey-hat-no-such-command"], check=False, capture=True
+    )
+
+    assert result.returncode == 127
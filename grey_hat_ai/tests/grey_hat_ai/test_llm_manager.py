@@ -0,0 +1,386 @@
+import asyncio
+import re
+import types
+import zlib
+
+import pytest
+
+from grey_hat_ai import llm_manager
+from grey_hat_ai.llm_manager import RETRY_MAX_DELAY, _is_retryable, _retry_delay
+
+
+class StatusError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.headers = headers
+
+
+class Response:
+    def __init__(self, headers):
+        self.headers = headers
+
+
+class ResponseError(Exception):
+    def __init__(self, headers):
+        super().__init__("error")
+        self.response = Response(headers)
+
+
+@pytest.mark.parametrize("status", [408, 429, 500, 503])
+def test_is_retryable_transient_status(status):
+    assert _is_retryable(StatusError(status))
+
+
+@pytest.mark.parametrize("status", [400, 401, 403, 404])
+def test_is_retryable_rejects_client_errors(status):
+    assert not _is_retryable(StatusError(status))
+
+
+def test_is_retryable_network_errors():
+    assert _is_retryable(TimeoutError())
+    assert _is_retryable(ConnectionError())
+    assert not _is_retryable(ValueError("bad request"))
+
+
+def test_retry_delay_honours_retry_after():
+    assert _retry_delay(StatusError(429, {"retry-after": "2"}), attempt=0) == 2.0
+    assert _retry_delay(ResponseError({"retry-after": "3.5"}), attempt=0) == 3.5
+
+
+def test_retry_delay_caps_retry_after():
+    assert _retry_delay(StatusError(429, {"retry-after": "3600"}), attempt=0) == RETRY_MAX_DELAY
+
+
+def test_retry_delay_full_jitter(monkeypatch):
+    monkeypatch.setattr(llm_manager.random, "uniform", lambda low, high: high)
+
+    assert _retry_delay(StatusError(503), attempt=0) == llm_manager.RETRY_BASE_DELAY
+    assert _retry_delay(StatusError(503), attempt=2) == llm_manager.RETRY_BASE_DELAY * 4
+    assert _retry_delay(StatusError(503, {"retry-after": "soon"}), attempt=20) == RETRY_MAX_DELAY
+
+
+def _caching_manager(monkeypatch, **kwargs):
+    np = pytest.importorskip("numpy")
+    manager = llm_manager.LLMManager(**kwargs)
+    manager.active_provider = "groq"
+    manager.active_model = "llama3-70b-8192"
+
+    def embed(text):
+        # Prompts that differ only in "please" or their identifiers embed identically;
+        # any others are orthogonal
+        words = " ".join(word for word in re.findall(r"[a-z]+", text.lower()) if word != "please")
+        vector = np.zeros(1024, dtype=np.float32)
+        vector[zlib.crc32(words.encode()) % len(vector)] = 1
+        return vector
+
+    monkeypatch.setattr(manager._semantic_cache, "embed", embed)
+    manager.prompts = []
+
+    def generate(prompt, history, max_tokens, temperature, session_id):
+        manager.prompts.append(prompt)
+        return llm_manager.LLMResponse(content=f"answer to {prompt}", model=manager.active_model, provider="groq")
+
+    manager._generate_groq = generate
+    return manager
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    return _caching_manager(monkeypatch)
+
+
+def test_semantic_cache_never_answers_for_another_target(manager):
+    first = manager.generate_response("scan 10.0.0.1", temperature=0)
+    second = manager.generate_response("scan 10.0.0.2", temperature=0)
+
+    assert first.content == "answer to scan 10.0.0.1"
+    assert second.content == "answer to scan 10.0.0.2"
+    assert manager.prompts == ["scan 10.0.0.1", "scan 10.0.0.2"]
+
+
+def test_semantic_cache_serves_rephrased_prompt_for_same_target(manager):
+    manager.generate_response("scan 10.0.0.1", temperature=0)
+    cached = manager.generate_response("please scan 10.0.0.1", temperature=0)
+
+    assert cached.content == "answer to scan 10.0.0.1"
+    assert manager.prompts == ["scan 10.0.0.1"]
+
+
+def test_exact_cache_hit_skips_provider(manager):
+    manager.generate_response("What is XSS?", temperature=0)
+    cached = manager.generate_response("What is XSS?", temperature=0)
+
+    assert cached.content == "answer to What is XSS?"
+    assert manager.prompts == ["What is XSS?"]
+
+
+def test_sampled_responses_not_cached(manager):
+    manager.generate_response("What is XSS?", temperature=0.9)
+    manager.generate_response("What is XSS?", temperature=0.9)
+
+    assert manager.prompts == ["What is XSS?", "What is XSS?"]
+
+
+def test_cache_scoped_to_history(manager):
+    manager.generate_response("Explain it", temperature=0)
+    manager.generate_response("Explain it", history=[{"role": "user", "content": "What is XSS?"}], temperature=0)
+
+    assert manager.prompts == ["Explain it", "Explain it"]
+
+
+def test_cache_scoped_to_model(manager):
+    manager.generate_response("What is XSS?", temperature=0)
+    manager.active_model = "llama3-8b-8192"
+    manager.generate_response("What is XSS?", temperature=0)
+
+    assert len(manager.prompts) == 2
+
+
+def test_exact_cache_bounded(monkeypatch):
+    manager = _caching_manager(monkeypatch, cache_max_entries=2)
+    for prompt in ("one", "two", "three"):
+        manager.generate_response(prompt, temperature=0)
+
+    assert len(manager._response_cache) == 2
+
+
+def test_cache_persisted_across_managers(monkeypatch, tmp_path):
+    path = str(tmp_path / "responses.db")
+    first = _caching_manager(monkeypatch, cache_path=path)
+    first.generate_response("scan 10.0.0.1", temperature=0)
+
+    second = _caching_manager(monkeypatch, cache_path=path)
+    exact = second.generate_response("scan 10.0.0.1", temperature=0)
+    semantic = second.generate_response("please scan 10.0.0.1", temperature=0)
+
+    assert exact.content == semantic.content == "answer to scan 10.0.0.1"
+    assert second.prompts == []
+
+
+def test_clear_cache_drops_persisted_entries(monkeypatch, tmp_path):
+    path = str(tmp_path / "responses.db")
+    first = _caching_manager(monkeypatch, cache_path=path)
+    first.generate_response("What is XSS?", temperature=0)
+    first.clear_cache()
+
+    second = _caching_manager(monkeypatch, cache_path=path)
+    second.generate_response("What is XSS?", temperature=0)
+
+    assert second.prompts == ["What is XSS?"]
+
+
+async def test_async_generation_shares_the_cache(manager):
+    async def agenerate(prompt, history, max_tokens, temperature, session_id):
+        manager.prompts.append(prompt)
+        return llm_manager.LLMResponse(content=f"async answer to {prompt}", model=manager.active_model, provider="groq")
+
+    manager._agenerate_groq = agenerate
+    manager._async_client = lambda provider: (object(), asyncio.Semaphore(4))
+    manager.generate_response("What is XSS?", temperature=0)
+    responses = await manager.agenerate_batch(["What is XSS?", "What is CSRF?"], temperature=0)
+
+    assert [response.content for response in responses] == ["answer to What is XSS?", "async answer to What is CSRF?"]
+    assert manager.prompts == ["What is XSS?", "What is CSRF?"]
+
+
+def _streaming_manager(stream):
+    manager = llm_manager.LLMManager()
+    manager.active_provider = "groq"
+    manager.active_model = "llama3-70b-8192"
+    manager._stream_groq = lambda prompt, history, max_tokens, temperature, session_id: stream()
+    return manager
+
+
+def test_stream_response_raises_when_cut_short():
+    def stream():
+        yield "The scan found "
+        raise ValueError("connection reset")
+
+    chunks = _streaming_manager(stream).stream_response("scan 10.0.0.1")
+
+    assert next(chunks) == "The scan found "
+    with pytest.raises(ValueError):
+        next(chunks)
+
+
+def test_stream_response_logs_failure_before_first_chunk():
+    def stream():
+        raise ValueError("invalid api key")
+        yield
+
+    assert list(_streaming_manager(stream).stream_response("scan 10.0.0.1")) == []
+
+
+def _turns(*pairs):
+    history = []
+    for prompt, reply in pairs:
+        history.append({"role": "user", "content": prompt})
+        history.append({"role": "assistant", "content": reply})
+    return history
+
+
+@pytest.fixture
+def converting_manager():
+    manager = llm_manager.LLMManager()
+    manager.converted = []
+
+    def chat_message(provider, role, content):
+        manager.converted.append(content)
+        return {"role": role, "content": content}
+
+    manager._chat_message = chat_message
+    return manager
+
+
+def _turn(manager, session_id, prompt, history, reply):
+    key = ("groq", session_id)
+    messages, synced = manager._session_messages(key, prompt, history)
+    manager._keep_session_messages(key, messages, synced, prompt, reply)
+    return messages
+
+
+def test_dropped_prefix():
+    synced = [(msg["role"], msg["content"]) for msg in _turns(("q1", "a1"), ("q2", "a2"))]
+
+    assert llm_manager.LLMManager._dropped_prefix(synced, _turns(("q1", "a1"), ("q2", "a2"))) == 0
+    assert llm_manager.LLMManager._dropped_prefix(synced, _turns(("q2", "a2"))) == 2
+    assert llm_manager.LLMManager._dropped_prefix(synced, _turns(("q1", "a1"))) is None
+    assert llm_manager.LLMManager._dropped_prefix(synced, _turns(("q0", "a0"), ("q1", "a1"), ("q2", "a2"))) is None
+
+
+def test_session_messages_converts_only_new_turn(converting_manager):
+    _turn(converting_manager, "s1", "q1", [], "a1")
+    converting_manager.converted.clear()
+
+    messages = _turn(converting_manager, "s1", "q2", _turns(("q1", "a1")), "a2")
+
+    assert converting_manager.converted == ["q2", "a2"]
+    assert [msg["content"] for msg in messages] == ["q1", "a1", "q2", "a2"]
+
+
+def test_session_messages_reused_when_window_slides(converting_manager):
+    _turn(converting_manager, "s1", "q1", [], "a1")
+    _turn(converting_manager, "s1", "q2", _turns(("q1", "a1")), "a2")
+    converting_manager.converted.clear()
+
+    # A rolling window of two messages has dropped the first turn
+    messages = _turn(converting_manager, "s1", "q3", _turns(("q2", "a2")), "a3")
+
+    assert converting_manager.converted == ["q3", "a3"]
+    assert [msg["content"] for msg in messages] == ["q2", "a2", "q3", "a3"]
+
+
+def test_session_messages_rebuilt_for_different_history(converting_manager):
+    _turn(converting_manager, "s1", "q1", [], "a1")
+    converting_manager.converted.clear()
+
+    messages = _turn(converting_manager, "s1", "q2", _turns(("edited", "a1")), "a2")
+
+    assert converting_manager.converted == ["edited", "a1", "q2", "a2"]
+    assert [msg["content"] for msg in messages] == ["edited", "a1", "q2", "a2"]
+
+
+def test_session_messages_kept_per_session(converting_manager):
+    _turn(converting_manager, "s1", "q1", [], "a1")
+    _turn(converting_manager, "s2", "other", [], "reply")
+    converting_manager.converted.clear()
+
+    _turn(converting_manager, "s1", "q2", _turns(("q1", "a1")), "a2")
+
+    assert converting_manager.converted == ["q2", "a2"]
+
+
+def test_least_recently_used_session_dropped(converting_manager, monkeypatch):
+    monkeypatch.setattr(llm_manager, "MAX_CHAT_SESSIONS", 2)
+    for session_id in ("s1", "s2", "s3"):
+        _turn(converting_manager, session_id, "q1", [], "a1")
+
+    assert [key[1] for key in converting_manager._converted_history] == ["s2", "s3"]
+
+
+class FakeChat:
+    def __init__(self, history):
+        self.history = list(history)
+
+    def send_message(self, prompt, generation_config=None):
+        reply = f"answer to {prompt}"
+        self.history += [prompt, reply]
+        return types.SimpleNamespace(text=reply)
+
+
+def test_gemini_chat_reused_when_window_slides():
+    manager = llm_manager.LLMManager()
+    key = ("gemini-1.5-pro", "s1")
+    chat = FakeChat(["q1", "a1", "q2", "a2"])
+    manager._keep_gemini_chat(key, chat, [("user", "q1"), ("assistant", "a1")], "q2", "a2")
+
+    reused, synced = manager._gemini_chat(key, _turns(("q2", "a2")))
+
+    assert reused is chat
+    assert chat.history == ["q2", "a2"]
+    assert synced == [("user", "q2"), ("assistant", "a2")]
+    # Checked out until handed back
+    assert key not in manager._gemini_chats
+
+
+class FakeGenAI:
+    def __init__(self):
+        self.chats = []
+        self.types = types.SimpleNamespace(GenerationConfig=lambda **kwargs: kwargs)
+
+    def configure(self, api_key):
+        pass
+
+    def GenerativeModel(self, model_name):
+        return types.SimpleNamespace(start_chat=self.start_chat)
+
+    def start_chat(self, history):
+        chat = FakeChat(msg["parts"][0] for msg in history)
+        self.chats.append(chat)
+        return chat
+
+
+@pytest.fixture
+def gemini_manager(monkeypatch):
+    genai = FakeGenAI()
+    monkeypatch.setattr(llm_manager, "genai", genai)
+    manager = llm_manager.LLMManager()
+    manager.set_api_key("gemini", "key")
+    manager.set_active_model("gemini", "gemini-1.5-pro")
+    manager.genai = genai
+    return manager
+
+
+def test_gemini_session_reused_across_turns(gemini_manager):
+    gemini_manager.generate_response("q1", temperature=0.9)
+    gemini_manager.generate_response("q2", history=_turns(("q1", "answer to q1")), temperature=0.9)
+
+    assert len(gemini_manager.genai.chats) == 1
+    assert gemini_manager.genai.chats[0].history == ["q1", "answer to q1", "q2", "answer to q2"]
+
+
+def test_gemini_session_restarted_for_edited_history(gemini_manager):
+    gemini_manager.generate_response("q1", temperature=0.9)
+    gemini_manager.generate_response("q2", history=_turns(("edited", "answer to q1")), temperature=0.9)
+
+    assert len(gemini_manager.genai.chats) == 2
+    assert gemini_manager.genai.chats[1].history == ["edited", "answer to q1", "q2", "answer to q2"]
+
+
+def test_gemini_sessions_kept_per_session_id(gemini_manager):
+    gemini_manager.generate_response("q1", temperature=0.9, session_id="s1")
+    gemini_manager.generate_response("other", temperature=0.9, session_id="s2")
+    gemini_manager.generate_response("q2", history=_turns(("q1", "answer to q1")), temperature=0.9, session_id="s1")
+
+    assert len(gemini_manager.genai.chats) == 2
+
+
+def test_set_api_key_drops_gemini_models_and_sessions(gemini_manager):
+    gemini_manager.generate_response("q1", temperature=0.9)
+    assert gemini_manager._gemini_models and gemini_manager._gemini_chats
+
+    gemini_manager.set_api_key("gemini", "new key")
+
+    assert gemini_manager._gemini_models == {}
+    assert gemini_manager._gemini_chats == {}
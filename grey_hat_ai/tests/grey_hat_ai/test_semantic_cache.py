@@ -0,0 +1,117 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from grey_hat_ai import semantic_cache
+from grey_hat_ai.semantic_cache import SemanticCache, identifier_key
+
+
+def _vector(*values):
+    vector = np.array(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+class FakeIndexFlatIP:
+    """Minimal stand-in for faiss.IndexFlatIP, renumbering ids on removal like IndexFlat."""
+
+    def __init__(self, dim):
+        self.vectors = np.empty((0, dim), dtype=np.float32)
+        self.removed = []
+
+    def add(self, vectors):
+        self.vectors = np.vstack([self.vectors, vectors])
+
+    def search(self, vector, k):
+        scores = self.vectors @ vector[0]
+        top = np.argsort(-scores)[:k]
+        return scores[top].reshape(1, -1), top.reshape(1, -1)
+
+    def remove_ids(self, ids):
+        self.removed.extend(int(i) for i in ids)
+        self.vectors = np.delete(self.vectors, ids, axis=0)
+
+
+class FakeFaiss:
+    IndexFlatIP = FakeIndexFlatIP
+
+
+@pytest.fixture(params=["numpy", "faiss"])
+def cache(request, monkeypatch):
+    monkeypatch.setattr(semantic_cache, "faiss", FakeFaiss if request.param == "faiss" else None)
+    return SemanticCache(threshold=0.9, max_entries=2)
+
+
+def test_identifier_key_extracts_targets():
+    assert identifier_key("Scan 10.0.0.1, then report.") == "10.0.0.1"
+    assert identifier_key("Is port 22 open on Example.com?") == "22 example.com"
+    assert identifier_key("Check CVE-2021-44228 at /admin") == "cve-2021-44228 /admin"
+
+
+def test_identifier_key_empty_for_plain_text():
+    assert identifier_key("What is XSS? Explain it.") == ""
+
+
+def test_lookup_hit_and_miss(cache):
+    cache.insert(_vector(1, 0, 0), "a")
+
+    assert cache.lookup(_vector(1, 0.01, 0)) == "a"
+    assert cache.lookup(_vector(0, 1, 0)) is None
+    assert cache.lookup(None) is None
+
+
+def test_lookup_respects_namespace(cache):
+    cache.insert(_vector(1, 0, 0), "groq", namespace="groq:llama")
+
+    assert cache.lookup(_vector(1, 0, 0), namespace="groq:llama") == "groq"
+    assert cache.lookup(_vector(1, 0, 0), namespace="gemini:pro") is None
+    assert cache.lookup(_vector(1, 0, 0)) is None
+
+
+def test_lookup_skips_other_namespace_to_find_match(cache):
+    cache.insert(_vector(1, 0, 0), "other", namespace="a")
+    cache.insert(_vector(1, 0.05, 0), "mine", namespace="b")
+
+    assert cache.lookup(_vector(1, 0, 0), namespace="b") == "mine"
+
+
+def test_insert_evicts_least_recently_used(cache):
+    cache.insert(_vector(1, 0, 0), "a")
+    cache.insert(_vector(0, 1, 0), "b")
+    # A hit makes "a" the most recently used, so "b" is evicted
+    assert cache.lookup(_vector(1, 0, 0)) == "a"
+    cache.insert(_vector(0, 0, 1), "c")
+
+    assert cache.lookup(_vector(1, 0, 0)) == "a"
+    assert cache.lookup(_vector(0, 1, 0)) is None
+    assert cache.lookup(_vector(0, 0, 1)) == "c"
+
+
+def test_eviction_keeps_faiss_ids_aligned(monkeypatch):
+    monkeypatch.setattr(semantic_cache, "faiss", FakeFaiss)
+    cache = SemanticCache(threshold=0.9, max_entries=2)
+
+    cache.insert(_vector(1, 0, 0), "a")
+    cache.insert(_vector(0, 1, 0), "b")
+    cache.insert(_vector(0, 0, 1), "c")
+
+    assert cache._index.removed == [0]
+    assert cache.lookup(_vector(1, 0, 0)) is None
+    assert cache.lookup(_vector(0, 1, 0)) == "b"
+    assert cache.lookup(_vector(0, 0, 1)) == "c"
+
+
+def test_clear_drops_entries(cache):
+    cache.insert(_vector(1, 0, 0), "a")
+    cache.clear()
+
+    assert cache.lookup(_vector(1, 0, 0)) is None
+
+
+def test_lookup_not_crowded_out_by_closer_entries_in_other_namespaces(monkeypatch):
+    monkeypatch.setattr(semantic_cache, "faiss", None)
+    cache = SemanticCache(threshold=0.9, max_entries=100)
+    for i in range(10):
+        cache.insert(_vector(1, 0, 0), f"other {i}", namespace=f"groq:10.0.0.{i}")
+    cache.insert(_vector(1, 0.1, 0), "mine", namespace="groq:10.0.0.99")
+
+    assert cache.lookup(_vector(1, 0, 0), namespace="groq:10.0.0.99") == "mine"
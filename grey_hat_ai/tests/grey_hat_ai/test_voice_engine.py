@@ -0,0 +1,154 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from grey_hat_ai import voice_engine
+from grey_hat_ai.voice_engine import VoiceConfig, VoiceEngine, iter_sentences
+
+
+def test_iter_sentences_regroups_chunks():
+    chunks = ["Hel", "lo there. How", " are you? Fine", "!"]
+
+    assert list(iter_sentences(chunks)) == ["Hello there.", "How are you?", "Fine!"]
+
+
+def test_iter_sentences_yields_before_stream_ends():
+    def chunks():
+        yield "First sentence. Sec"
+        raise AssertionError("sentence should be yielded before the next chunk is read")
+
+    assert next(iter_sentences(chunks())) == "First sentence."
+
+
+def test_iter_sentences_keeps_dotted_identifiers():
+    assert list(iter_sentences(["Scan 10.0.0.1 now. Done"])) == ["Scan 10.0.0.1 now.", "Done"]
+
+
+def test_iter_sentences_skips_blank_text():
+    assert list(iter_sentences(["", "   ", "\n"])) == []
+
+
+@pytest.fixture
+def engine(monkeypatch, tmp_path):
+    # Keep construction from loading Whisper in the background
+    monkeypatch.setattr(voice_engine, "WhisperModel", None)
+    return VoiceEngine(VoiceConfig(tts_cache_dir=str(tmp_path)))
+
+
+def test_concurrent_writes_of_same_clip(engine, tmp_path, caplog):
+    audio = b"\xff" * 50000
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: engine._write_tts_file("voice", "digest", audio), range(64)))
+
+    assert "Failed to cache TTS audio" not in caplog.text
+    assert os.listdir(tmp_path / "voice") == ["digest.mp3"]
+    assert (tmp_path / "voice" / "digest.mp3").read_bytes() == audio
+
+
+def test_disk_cache_serves_new_engine(engine, tmp_path):
+    audio, entry = engine._tts_lookup("Scan complete.", "voice")
+    assert audio is None
+    engine._tts_store(entry, b"clip")
+
+    other = VoiceEngine(VoiceConfig(tts_cache_dir=str(tmp_path)))
+    audio, entry = other._tts_lookup("Scan complete.", "voice")
+
+    assert audio == b"clip"
+    assert entry is None
+
+
+def test_disk_cache_trims_least_recently_used(monkeypatch, tmp_path):
+    monkeypatch.setattr(voice_engine, "WhisperModel", None)
+    engine = VoiceEngine(VoiceConfig(tts_cache_dir=str(tmp_path), tts_cache_max_mb=1))
+    clip = b"\0" * 300 * 1024
+    for i in range(3):
+        engine._write_tts_file("voice", f"clip{i}", clip)
+        os.utime(tmp_path / "voice" / f"clip{i}.mp3", (1000 + i, 1000 + i))
+
+    engine._write_tts_file("voice", "clip3", clip)
+
+    assert sorted(os.listdir(tmp_path / "voice")) == ["clip1.mp3", "clip2.mp3", "clip3.mp3"]
+    assert engine._tts_disk_bytes == 3 * len(clip)
+
+
+def test_memory_cache_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(voice_engine, "WhisperModel", None)
+    engine = VoiceEngine(VoiceConfig(tts_cache_dir=None, tts_memory_cache_mb=1))
+    clip = b"\0" * 400 * 1024
+    engine._tts_cache_put("a", clip)
+    engine._tts_cache_put("b", clip)
+    # Reading "a" makes "b" the least recently used
+    assert engine._tts_cache_get("a") == clip
+
+    engine._tts_cache_put("c", clip)
+
+    assert list(engine.tts_cache) == ["a", "c"]
+    assert engine._tts_cache_bytes == 2 * len(clip)
+
+
+def test_memory_cache_keeps_clip_larger_than_limit(monkeypatch):
+    monkeypatch.setattr(voice_engine, "WhisperModel", None)
+    engine = VoiceEngine(VoiceConfig(tts_cache_dir=None, tts_memory_cache_mb=1))
+    engine._tts_cache_put("small", b"\0" * 1024)
+
+    engine._tts_cache_put("large", b"\0" * 2 * 1024 * 1024)
+
+    assert list(engine.tts_cache) == ["large"]
+
+
+def test_memory_cache_replacing_clip_updates_size(monkeypatch):
+    monkeypatch.setattr(voice_engine, "WhisperModel", None)
+    engine = VoiceEngine(VoiceConfig(tts_cache_dir=None))
+    engine._tts_cache_put("a", b"\0" * 100)
+
+    engine._tts_cache_put("a", b"\0" * 10)
+
+    assert engine._tts_cache_bytes == 10
+
+
+def test_changed_voice_settings_never_replay_stale_audio(engine):
+    _, entry = engine._tts_lookup("Scan complete.", "voice")
+    engine._tts_store(entry, b"calm")
+
+    engine.config.elevenlabs_stability = 0.2
+    audio, entry = engine._tts_lookup("Scan complete.", "voice")
+
+    assert audio is None
+    assert entry is not None
+
+
+def test_other_voice_never_replays_audio(engine):
+    _, entry = engine._tts_lookup("Scan complete.", "rachel")
+    engine._tts_store(entry, b"rachel")
+
+    audio, _ = engine._tts_lookup("Scan complete.", "adam")
+
+    assert audio is None
+
+
+@pytest.fixture
+def semantic_engine(engine, monkeypatch):
+    np = pytest.importorskip("numpy")
+    # Every text embeds identically, so any lookup reaching the semantic tier hits
+    monkeypatch.setattr(engine._semantic_tts_cache, "embed", lambda text: np.ones(4, dtype=np.float32) / 2)
+    return engine
+
+
+def test_semantic_tier_reuses_audio_for_near_identical_text(semantic_engine):
+    _, entry = semantic_engine._tts_lookup("The scan is complete.", "voice")
+    semantic_engine._tts_store(entry, b"complete")
+
+    audio, _ = semantic_engine._tts_lookup("The scan is complete!", "voice")
+
+    assert audio == b"complete"
+
+
+def test_semantic_tier_skipped_for_identifiers(semantic_engine):
+    _, entry = semantic_engine._tts_lookup("Port 22 is open.", "voice")
+    semantic_engine._tts_store(entry, b"port 22")
+
+    audio, _ = semantic_engine._tts_lookup("Port 23 is open.", "voice")
+
+    assert audio is None